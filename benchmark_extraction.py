@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compares text extraction from the HTML and PDF versions of the same acts.
+
+Usage:
+    python benchmark_extraction.py [ELI ...] [--repeat N]
+
+Both documents of every act are downloaded once, then each extractor is timed over N runs.
+The report lists the median extraction time, the downloaded size and the size of the
+extracted text (characters and cl100k tokens) for both sources.
+"""
+
+import argparse
+import statistics
+import time
+import requests
+import tiktoken
+from html_text import html_to_text
+from pdf_text import pdf_to_text
+
+DEFAULT_ELIS = [
+    "DU/2025/394",
+    "DU/2024/1716",
+    "DU/2023/1465",
+]
+
+def download(url: str) -> bytes:
+    """
+    Downloads a document, returning None if it is not available.
+    """
+    response = requests.get(url, timeout=60)
+    if response.status_code != 200:
+        return None
+    return response.content
+
+def time_extraction(extract, content: bytes, repeat: int) -> tuple:
+    """
+    Runs an extractor repeat times and returns the median duration in seconds and the extracted text.
+    """
+    durations = []
+    text = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = extract(content)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), text
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML vs PDF text extraction")
+    parser.add_argument("elis", nargs="*", default=DEFAULT_ELIS, help="ELIs of acts to benchmark, e.g. DU/2025/394")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs per document")
+    args = parser.parse_args()
+
+    encoding = tiktoken.get_encoding("cl100k_base")
+    header = f"{'ELI':<16}{'source':<8}{'download KB':>12}{'extract ms':>12}{'chars':>10}{'tokens':>10}"
+    print(header)
+    print("-" * len(header))
+
+    totals = {"html": [0.0, 0, 0], "pdf": [0.0, 0, 0]}
+    for eli in args.elis:
+        documents = {
+            "html": (f"https://api.sejm.gov.pl/eli/acts/{eli}/text.html", html_to_text),
+            "pdf": (f"https://api.sejm.gov.pl/eli/acts/{eli}/text.pdf", pdf_to_text),
+        }
+        contents = {source: download(url) for source, (url, _) in documents.items()}
+        if not all(contents.values()):
+            print(f"{eli:<16}skipped, HTML or PDF text not available")
+            continue
+
+        for source, (_, extract) in documents.items():
+            duration, text = time_extraction(extract, contents[source], args.repeat)
+            tokens = len(encoding.encode(text))
+            totals[source][0] += duration
+            totals[source][1] += len(text)
+            totals[source][2] += tokens
+            print(f"{eli:<16}{source:<8}{len(contents[source]) / 1024:>12.1f}{duration * 1000:>12.1f}{len(text):>10}{tokens:>10}")
+
+    print("-" * len(header))
+    for source, (duration, chars, tokens) in totals.items():
+        print(f"{'total':<16}{source:<8}{'':>12}{duration * 1000:>12.1f}{chars:>10}{tokens:>10}")
+    if totals["html"][0]:
+        print(f"PDF extraction is {totals['pdf'][0] / totals['html'][0]:.1f}x slower than HTML")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import os
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase
+
+class Base(DeclarativeBase):
+    """
+    Declarative base shared by all tables kept in the LawScrapper database.
+    """
+    pass
+
+_engines = {}
+
+def get_engine(url: str) -> Engine:
+    """
+    Returns a shared engine for the database URL, creating the SQLite directory on first use
+    and any tables defined since the previous call.
+
+    Parameters:
+        url (str): SQLAlchemy database URL.
+
+    Returns:
+        Engine: SQLAlchemy engine.
+    """
+    if url not in _engines:
+        if url.startswith("sqlite:///"):
+            directory = os.path.dirname(url[len("sqlite:///"):])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        _engines[url] = create_engine(url)
+    Base.metadata.create_all(_engines[url])
+    return _engines[url]
@@ -0,0 +1,199 @@
+import hashlib
+import random
+import re
+import struct
+from datetime import datetime
+from sqlalchemy import String, Float, Integer, LargeBinary, DateTime, select
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from database import Base, get_engine
+from logger import Logger
+
+logger = Logger(to_file=True).get_logger()
+
+# Mersenne prime used for the universal hash permutations of MinHash
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+class ActSignature(Base):
+    """
+    MinHash signature of the extracted text of a summarized act.
+    """
+    __tablename__ = "act_signatures"
+
+    eli: Mapped[str] = mapped_column(String, primary_key=True)
+    signature: Mapped[bytes] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+class LshBucket(Base):
+    """
+    Locality-sensitive hashing bucket: acts sharing a bucket in any band are near-duplicate candidates.
+    """
+    __tablename__ = "lsh_buckets"
+
+    band: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket: Mapped[str] = mapped_column(String(32), primary_key=True)
+    eli: Mapped[str] = mapped_column(String, primary_key=True)
+
+class DuplicateAudit(Base):
+    """
+    Audit trail of summaries reused from a near-duplicate act instead of calling the LLM.
+    """
+    __tablename__ = "duplicate_audit"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    eli: Mapped[str] = mapped_column(String, index=True)
+    duplicate_of: Mapped[str] = mapped_column(String)
+    similarity: Mapped[float] = mapped_column(Float)
+    action: Mapped[str] = mapped_column(String)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+def shingles(text: str, size: int = 5) -> set:
+    """
+    Returns the set of word n-grams (shingles) of a lower-cased text.
+
+    Parameters:
+        text (str): Act text.
+        size (int): Number of words per shingle.
+
+    Returns:
+        set: Shingles as strings; a text shorter than size words yields a single shingle.
+    """
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[start:start + size]) for start in range(len(words) - size + 1)}
+
+class NearDuplicateIndex():
+    def __init__(self, url: str = "sqlite:///cache/lawscrapper.db", threshold: float = 0.9, num_perm: int = 128, bands: int = 16, shingle_size: int = 5):
+        """
+        Persistent MinHash/LSH index of the texts of summarized acts. It finds previously summarized acts
+        whose text is nearly identical to a new one, e.g. a consolidated text ("obwieszczenie w sprawie
+        ogłoszenia jednolitego tekstu") of an act summarized before, so their summary can be reused.
+
+        Parameters:
+            url (str): SQLAlchemy database URL.
+            threshold (float): Minimum estimated Jaccard similarity of shingles for a near-duplicate.
+            num_perm (int): Number of MinHash permutations (signature length).
+            bands (int): Number of LSH bands; num_perm must be divisible by it. More bands find
+                candidates with lower similarity, at the cost of more candidates to compare.
+            shingle_size (int): Number of words per shingle.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.engine = get_engine(url)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Fixed seed, so signatures stored by earlier runs stay comparable
+        generator = random.Random(1)
+        self._permutations = [(generator.randrange(1, MERSENNE_PRIME), generator.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, text: str) -> list:
+        """
+        Computes the MinHash signature of a text.
+
+        Parameters:
+            text (str): Act text.
+
+        Returns:
+            list: num_perm 32-bit minimum hash values.
+        """
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+            for shingle in shingles(text, self.shingle_size)
+        ]
+        return [
+            min(((a * value + b) % MERSENNE_PRIME) & MAX_HASH for value in hashes)
+            for a, b in self._permutations
+        ]
+
+    def similarity(self, first: list, second: list) -> float:
+        """
+        Estimates the Jaccard similarity of two texts from their signatures.
+        """
+        return sum(x == y for x, y in zip(first, second)) / self.num_perm
+
+    def find(self, signature: list, exclude: str = None) -> tuple:
+        """
+        Finds the most similar indexed act at or above the similarity threshold.
+
+        Parameters:
+            signature (list): Signature of the new text.
+            exclude (str, optional): ELI to ignore, usually the act being checked.
+
+        Returns:
+            tuple: (ELI, similarity) of the best match, or (None, 0.0) if there is none.
+        """
+        buckets = self._buckets(signature)
+        with Session(self.engine) as session:
+            candidates = set()
+            for band, bucket in buckets:
+                candidates.update(session.scalars(select(LshBucket.eli).where(LshBucket.band == band, LshBucket.bucket == bucket)))
+            candidates.discard(exclude)
+
+            best, best_similarity = None, 0.0
+            for eli in candidates:
+                record = session.get(ActSignature, eli)
+                if record is None:
+                    continue
+                similarity = self.similarity(signature, self._unpack(record.signature))
+                if similarity > best_similarity:
+                    best, best_similarity = eli, similarity
+
+        if best_similarity < self.threshold:
+            return None, 0.0
+        return best, best_similarity
+
+    def add(self, eli: str, signature: list):
+        """
+        Indexes (or re-indexes) the signature of an act.
+        """
+        with Session(self.engine) as session:
+            for bucket in session.scalars(select(LshBucket).where(LshBucket.eli == eli)):
+                session.delete(bucket)
+            session.merge(ActSignature(eli=eli, signature=self._pack(signature), created_at=datetime.now()))
+            for band, bucket in self._buckets(signature):
+                session.merge(LshBucket(band=band, bucket=bucket, eli=eli))
+            session.commit()
+
+    def record(self, eli: str, duplicate_of: str, similarity: float, action: str = "reused"):
+        """
+        Adds an entry to the audit trail of reused summaries.
+
+        Parameters:
+            eli (str): ELI of the new act.
+            duplicate_of (str): ELI of the act whose summary was reused.
+            similarity (float): Estimated similarity of the two texts.
+            action (str): What was done with the match, e.g. "reused".
+        """
+        with Session(self.engine) as session:
+            session.add(DuplicateAudit(eli=eli, duplicate_of=duplicate_of, similarity=similarity, action=action))
+            session.commit()
+        logger.info(f"{eli} is a near-duplicate of {duplicate_of} (similarity {similarity:.2f}), summary {action}")
+
+    def audit(self, limit: int = 100) -> list:
+        """
+        Returns the most recent audit entries as dictionaries.
+        """
+        with Session(self.engine) as session:
+            records = session.scalars(select(DuplicateAudit).order_by(DuplicateAudit.id.desc()).limit(limit))
+            return [
+                {"eli": record.eli, "duplicate_of": record.duplicate_of, "similarity": record.similarity, "action": record.action, "created_at": record.created_at}
+                for record in records
+            ]
+
+    def _buckets(self, signature: list) -> list:
+        return [
+            (band, hashlib.blake2b(self._pack(signature[band * self.rows:(band + 1) * self.rows]), digest_size=16).hexdigest())
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def _pack(values: list) -> bytes:
+        return struct.pack(f"<{len(values)}I", *values)
+
+    @staticmethod
+    def _unpack(data: bytes) -> list:
+        return list(struct.unpack(f"<{len(data) // 4}I", data))
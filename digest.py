@@ -0,0 +1,140 @@
+import csv
+import gzip
+import io
+from html import escape
+from string import Template
+
+# Gmail clips messages larger than about 102 KB
+DEFAULT_MAX_BYTES = 100 * 1024
+# Space left for the e-mail layout around the table (see send_notification), before encoding
+LAYOUT_BYTES = 16 * 1024
+# Space left for the headers, the plain-text part and the MIME boundaries
+HEADER_BYTES = 2 * 1024
+OVERFLOW_MODES = ("paginate", "csv", "html")
+
+CELL = 'style="font-size: 12px; line-height: 14.4px; padding: 8px; border: 1px solid #e2e8f0;" align="left" valign="top"'
+MUTED_CELL = 'style="font-size: 12px; line-height: 14.4px; padding: 8px; border: 1px solid #e2e8f0; color: #718096;" align="left" valign="top"'
+HEADER_CELL = 'style="font-size: 12px; line-height: 14.4px; padding: 8px; border-color: #e2e8f0; border-style: solid; border-width: 1px 1px 2px;" align="left" valign="top"'
+
+# Templates are compiled once at import; every field is HTML-escaped before substitution
+ROW_TEMPLATE = Template(
+    f"<tr><td {CELL}>$index</td><td {CELL}>$title</td><td {CELL}>$summary</td><td {CELL}>$promulgation</td>"
+    f"<td {CELL}>$announcement_date</td><td {CELL}>$entry_into_force</td><td {CELL}>$keywords</td>"
+    f'<td {CELL}><a href="$link" style="color: #0d6efd;">Poka&#380;</a></td></tr>'
+)
+TITLE_ONLY_TEMPLATE = Template(
+    f'<tr><td {MUTED_CELL}>$index</td><td {MUTED_CELL} colspan="7"><a href="$link" style="color: #718096;">$title</a> (poza profilem, bez podsumowania)</td></tr>'
+)
+TABLE_START = (
+    '<table class="table" border="0" cellpadding="0" cellspacing="0" style="width: 100%; max-width: 100%; border: 1px solid #e2e8f0;">'
+    f"<thead><tr><th {HEADER_CELL}>L.p</th><th {HEADER_CELL}>Tytu&#322; aktu</th><th {HEADER_CELL}>Podsumowanie</th>"
+    f"<th {HEADER_CELL}>Data og&#322;oszenia</th><th {HEADER_CELL}>Data wydania</th><th {HEADER_CELL}>Data wej&#347;cia w &#380;ycie</th>"
+    f"<th {HEADER_CELL}>S&#322;owa kluczowe</th><th {HEADER_CELL}>Tre&#347;&#263; aktu</th></tr></thead><tbody>"
+)
+TABLE_END = "</tbody></table>"
+PENDING_SUMMARY = "Podsumowanie w przygotowaniu, zostanie dołączone do kolejnego zestawienia"
+CSV_COLUMNS = ("eli", "title", "summary", "promulgation", "announcementDate", "entryIntoForce", "keywords", "pdf", "html")
+
+def render_row(index: int, act: dict) -> str:
+    """
+    Renders one table row of the digest. Acts marked as not relevant get a single title line.
+
+    Parameters:
+        index (int): Position of the act in the digest, starting at 1.
+        act (dict): Processed act.
+
+    Returns:
+        str: HTML table row.
+    """
+    link = escape(act.get("pdf") or act.get("html") or "", quote=True)
+    if act.get("relevant") is False:
+        return TITLE_ONLY_TEMPLATE.substitute(index=index, link=link, title=escape(str(act.get("title"))))
+    summary = PENDING_SUMMARY if act.get("pending") else act.get("summary")
+    return ROW_TEMPLATE.substitute(
+        index=index,
+        title=escape(str(act.get("title"))),
+        summary=escape(str(summary)),
+        promulgation=escape(str(act.get("promulgation"))),
+        announcement_date=escape(str(act.get("announcementDate"))),
+        entry_into_force=escape(str(act.get("entryIntoForce"))),
+        keywords=escape(str(act.get("keywords"))),
+        link=link,
+    )
+
+class DigestRenderer():
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, overflow: str = "paginate"):
+        """
+        Renders the digest table, keeping every e-mail under max_bytes so mail clients do not clip it.
+
+        Parameters:
+            max_bytes (int): Largest size of one e-mail as sent: headers and the base64-encoded HTML part
+                with the layout around the table. Attachments are not counted.
+            overflow (str): What to do with a digest that does not fit: "paginate" splits it into
+                several e-mails, "csv" or "html" sends the rows that fit and attaches the full
+                list as a gzip-compressed CSV or HTML file.
+        """
+        if overflow not in OVERFLOW_MODES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_MODES}")
+        self.max_bytes = max_bytes
+        self.overflow = overflow
+
+    def render(self, acts: list) -> list:
+        """
+        Renders the digest of processed acts.
+
+        Parameters:
+            acts (list): Processed acts in digest order.
+
+        Returns:
+            list: Parts to send, one per e-mail, as dicts with "table" (HTML), "attachments"
+            (list of (filename, bytes, MIME type)), "page", "pages" and "shown" (number of acts in the table).
+        """
+        rows = [render_row(index, act) for index, act in enumerate(acts, 1)]
+        pages = self._paginate(rows)
+        if len(pages) == 1:
+            return [{"table": self._table(pages[0]), "attachments": [], "page": 1, "pages": 1, "shown": len(rows)}]
+
+        if self.overflow == "paginate":
+            return [
+                {"table": self._table(page), "attachments": [], "page": number, "pages": len(pages), "shown": len(page)}
+                for number, page in enumerate(pages, 1)
+            ]
+
+        attachment = self._csv(acts) if self.overflow == "csv" else self._html(rows)
+        return [{"table": self._table(pages[0]), "attachments": [attachment], "page": 1, "pages": 1, "shown": len(pages[0])}]
+
+    def _paginate(self, rows: list) -> list:
+        """
+        Splits rows into pages whose e-mail fits in max_bytes once its HTML part is base64-encoded.
+        A single row larger than the budget gets a page of its own.
+        """
+        # Largest HTML part whose base64 form (4 bytes per 3, 76-character lines ending in CRLF) fits
+        # next to the headers, less the layout and the table markup
+        html_bytes = (self.max_bytes - HEADER_BYTES) * 76 // 78 * 3 // 4
+        budget = html_bytes - LAYOUT_BYTES - len(TABLE_START.encode()) - len(TABLE_END.encode())
+        pages = [[]]
+        size = 0
+        for row in rows:
+            row_size = len(row.encode())
+            if pages[-1] and size + row_size > budget:
+                pages.append([])
+                size = 0
+            pages[-1].append(row)
+            size += row_size
+        return pages
+
+    def _table(self, rows: list) -> str:
+        return "".join([TABLE_START, *rows, TABLE_END])
+
+    def _csv(self, acts: list) -> tuple:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        for act in acts:
+            summary = PENDING_SUMMARY if act.get("pending") else act.get("summary")
+            writer.writerow([summary if column == "summary" else act.get(column) for column in CSV_COLUMNS])
+        return ("lawscrapper-digest.csv.gz", gzip.compress(buffer.getvalue().encode("utf-8")), "application/gzip")
+
+    def _html(self, rows: list) -> tuple:
+        document = "".join(['<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>', self._table(rows), "</body></html>"])
+        return ("lawscrapper-digest.html.gz", gzip.compress(document.encode("utf-8")), "application/gzip")
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from logger import Logger
+
+logger = Logger(to_file=True).get_logger()
+
+class DocumentCache():
+    def __init__(self, directory: str = "cache/documents", max_size_mb: float = 500, max_age: int = 24 * 60 * 60, save_interval: float = 5):
+        """
+        Initializes a persistent, content-addressed cache for downloaded act documents and their extracted text.
+
+        Documents are stored once per SHA-256 of their content and indexed by ELI document key
+        (e.g. "DU/2025/394/text.pdf"), together with the ETag/Last-Modified validators needed for
+        conditional requests. The least recently used entries are evicted once the cache grows
+        beyond max_size_mb. The index keeps the size of every stored file and a running total, so
+        eviction never scans the directory, and it is written at most every save_interval seconds
+        and on close rather than on every access.
+
+        Parameters:
+            directory (str): Directory holding the index, documents and extracted texts.
+            max_size_mb (float): Maximum total size of stored files in megabytes.
+            max_age (int): Seconds after which an entry is revalidated with the server before use.
+            save_interval (float): Minimum number of seconds between two writes of the index.
+        """
+        self.directory = directory
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.max_age = max_age
+        self._index_path = os.path.join(directory, "index.json")
+        self.save_interval = save_interval
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "text"), exist_ok=True)
+        self._index, self._files = self._load_index()
+        # Number of keys per content hash, files are removed with the last one
+        self._refs = Counter(entry["sha256"] for entry in self._index.values())
+        self._total = sum(sum(sizes.values()) for sizes in self._files.values())
+        for sha256 in set(self._files) - set(self._refs):
+            self._remove_files(sha256)
+
+    @staticmethod
+    def key_from_url(url: str) -> str:
+        """
+        Derives the cache key (ELI plus document name) from a Sejm API document URL.
+
+        Parameters:
+            url (str): URL such as https://api.sejm.gov.pl/eli/acts/DU/2025/394/text.pdf
+
+        Returns:
+            str: Cache key such as "DU/2025/394/text.pdf", or the URL itself if it is not an ELI URL.
+        """
+        match = re.search(r"/eli/acts/(.+)$", url)
+        return match.group(1) if match else url
+
+    def get(self, key: str) -> dict:
+        """
+        Returns the index entry for a key, or None if the document is not cached.
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry and not os.path.exists(self._blob_path(entry["sha256"])):
+                # The file was removed behind our back, forget the entry
+                del self._index[key]
+                self._release(entry["sha256"])
+                self._mark_dirty()
+                return None
+            return dict(entry) if entry else None
+
+    def is_fresh(self, key: str) -> bool:
+        """
+        Checks whether a cached document was validated recently enough to be used without a request.
+        """
+        entry = self.get(key)
+        return bool(entry) and time.time() - entry["checked_at"] < self.max_age
+
+    def conditional_headers(self, key: str) -> dict:
+        """
+        Builds If-None-Match/If-Modified-Since headers for revalidating a cached document.
+
+        Parameters:
+            key (str): Cache key.
+
+        Returns:
+            dict: Request headers, empty if the document is not cached.
+        """
+        entry = self.get(key)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read(self, key: str) -> bytes:
+        """
+        Returns the cached document content, or None if it is not cached.
+        """
+        entry = self.get(key)
+        if not entry:
+            return None
+        self.touch(key, revalidated=False)
+        with open(self._blob_path(entry["sha256"]), "rb") as file:
+            return file.read()
+
+    def read_text(self, key: str, variant: str = "text") -> str:
+        """
+        Returns the cached extracted text of a document, or None if it was not extracted yet.
+
+        Parameters:
+            key (str): Cache key.
+            variant (str): Name of the extraction method that produced the text.
+        """
+        entry = self.get(key)
+        if not entry:
+            return None
+        path = self._text_path(entry["sha256"], variant)
+        if not os.path.exists(path):
+            return None
+        self.touch(key, revalidated=False)
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+
+    def store(self, key: str, url: str, content: bytes, etag: str = None, last_modified: str = None) -> str:
+        """
+        Stores a downloaded document under its content hash and indexes it by key.
+
+        Parameters:
+            key (str): Cache key.
+            url (str): URL the document was downloaded from.
+            content (bytes): Document content.
+            etag (str, optional): ETag response header.
+            last_modified (str, optional): Last-Modified response header.
+
+        Returns:
+            str: SHA-256 of the content.
+        """
+        sha256 = hashlib.sha256(content).hexdigest()
+        now = time.time()
+        with self._lock:
+            blob_path = self._blob_path(sha256)
+            if not os.path.exists(blob_path):
+                self._write_atomic(blob_path, content)
+            self._track(blob_path, sha256, len(content))
+            previous = self._index.get(key)
+            self._refs[sha256] += 1
+            self._index[key] = {
+                "url": url,
+                "sha256": sha256,
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked_at": now,
+                "accessed_at": now,
+            }
+            if previous:
+                self._release(previous["sha256"])
+            self._evict()
+            self._mark_dirty()
+        return sha256
+
+    def store_text(self, key: str, text: str, variant: str = "text"):
+        """
+        Stores the text extracted from a cached document.
+
+        Parameters:
+            key (str): Cache key.
+            text (str): Extracted text.
+            variant (str): Name of the extraction method that produced the text.
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if not entry:
+                return
+            content = text.encode("utf-8")
+            path = self._text_path(entry["sha256"], variant)
+            self._write_atomic(path, content)
+            self._track(path, entry["sha256"], len(content))
+            self._evict()
+            self._mark_dirty()
+
+    def touch(self, key: str, revalidated: bool = True):
+        """
+        Marks a cached document as recently used and, if revalidated, as confirmed by the server (HTTP 304).
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if not entry:
+                return
+            now = time.time()
+            entry["accessed_at"] = now
+            if revalidated:
+                entry["checked_at"] = now
+            self._mark_dirty()
+
+    def close(self):
+        """
+        Writes pending changes of the index to disk.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _evict(self):
+        """
+        Removes least recently used entries until the cache fits in max_size.
+        Files shared by several keys are only removed together with their last key.
+        """
+        if self._total <= self.max_size:
+            return
+
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["accessed_at"]):
+            if self._total <= self.max_size:
+                break
+            del self._index[key]
+            self._release(entry["sha256"])
+            logger.info(f"Evicted {key} from document cache")
+
+    def _track(self, path: str, sha256: str, size: int):
+        # Records the size of a stored file and keeps the running total in step
+        sizes = self._files.setdefault(sha256, {})
+        name = os.path.relpath(path, self.directory)
+        self._total += size - sizes.get(name, 0)
+        sizes[name] = size
+
+    def _release(self, sha256: str):
+        self._refs[sha256] -= 1
+        if self._refs[sha256] <= 0:
+            del self._refs[sha256]
+            self._remove_files(sha256)
+
+    def _remove_files(self, sha256: str):
+        for name, size in self._files.pop(sha256, {}).items():
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self._save_index()
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.directory, "blobs", f"{sha256}.bin")
+
+    def _text_path(self, sha256: str, variant: str) -> str:
+        return os.path.join(self.directory, "text", f"{sha256}.{variant}.txt")
+
+    def _load_index(self) -> tuple:
+        # Returns the entries and the file sizes per content hash; sizes are measured once
+        # when the index does not have them (older format or unreadable index)
+        data = {}
+        if os.path.exists(self._index_path):
+            try:
+                with open(self._index_path, "r", encoding="utf-8") as file:
+                    data = json.load(file)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading document cache index, starting empty: {e}")
+        if "entries" in data and "files" in data:
+            return data["entries"], data["files"]
+        return data, self._scan_files()
+
+    def _scan_files(self) -> dict:
+        files = {}
+        for folder in ("blobs", "text"):
+            for file_name in os.listdir(os.path.join(self.directory, folder)):
+                if file_name.endswith(".tmp"):
+                    continue
+                name = os.path.join(folder, file_name)
+                files.setdefault(file_name.split(".", 1)[0], {})[name] = os.path.getsize(os.path.join(self.directory, name))
+        return files
+
+    def _save_index(self):
+        self._write_atomic(self._index_path, json.dumps({"entries": self._index, "files": self._files}).encode("utf-8"))
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def _write_atomic(self, path: str, content: bytes):
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(content)
+        os.replace(temp_path, path)
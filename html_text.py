@@ -0,0 +1,81 @@
+import codecs
+import re
+from html.parser import HTMLParser
+
+# Tags that start a new line of text, so articles, paragraphs and points stay on separate lines
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "footer",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "ol", "p", "pre",
+    "section", "table", "tbody", "thead", "tfoot", "tr", "ul",
+}
+CELL_TAGS = {"td", "th"}
+SKIPPED_TAGS = {"head", "script", "style", "noscript", "template"}
+
+class HtmlTextExtractor(HTMLParser):
+    def __init__(self):
+        """
+        Incremental HTML-to-text converter. Markup is stripped as chunks are fed in, block-level
+        elements become line breaks and table cells are separated with " | ", so the article and
+        paragraph structure of an act survives without building a DOM.
+        """
+        super().__init__(convert_charrefs=True)
+        self._lines = []
+        self._current = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._end_line()
+        elif tag in CELL_TAGS and self._current:
+            self._current.append(" | ")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._end_line()
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._end_line()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def _end_line(self):
+        if self._current:
+            line = re.sub(r"\s+", " ", "".join(self._current)).strip(" |")
+            if line:
+                self._lines.append(line)
+            self._current = []
+
+    def get_text(self) -> str:
+        """
+        Closes the parser and returns the extracted text, one block per line.
+        """
+        self.close()
+        self._end_line()
+        return "\n".join(self._lines)
+
+def html_to_text(content: bytes, encoding: str = "utf-8", chunk_size: int = 64 * 1024) -> str:
+    """
+    Converts an HTML document to plain text, decoding and parsing it in chunks.
+
+    Parameters:
+        content (bytes): HTML document.
+        encoding (str): Character encoding of the document.
+        chunk_size (int): Number of bytes decoded and parsed at a time.
+
+    Returns:
+        str: Extracted plain text.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    extractor = HtmlTextExtractor()
+    view = memoryview(content)
+    for start in range(0, len(view), chunk_size):
+        extractor.feed(decoder.decode(view[start:start + chunk_size]))
+    extractor.feed(decoder.decode(b"", final=True))
+    return extractor.get_text()
@@ -0,0 +1,232 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
+import requests
+from tenacity import AsyncRetrying, Retrying, retry_if_exception_type, retry_if_result, stop_after_attempt, wait_random_exponential
+from rate_limit import TokenRateLimiter
+from logger import Logger
+
+logger = Logger(to_file=True).get_logger()
+
+# Statuses worth retrying: throttling and temporary server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Statuses signalling that the server wants fewer requests
+THROTTLE_STATUSES = {429, 503}
+
+def retry_after_seconds(response) -> float:
+    """
+    Parses the Retry-After header of a response (requests or httpx), given either in seconds or as an HTTP date.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid.
+    """
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class AdaptiveConcurrency():
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16):
+        """
+        Limits the number of requests in flight with AIMD (additive increase, multiplicative decrease):
+        the limit grows by about one per round of successful requests and is halved whenever the
+        server throttles, so parallel fetching settles just below what the API accepts.
+
+        Parameters:
+            initial (int): Starting limit.
+            minimum (int): Lowest limit.
+            maximum (int): Highest limit.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(initial)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+        """
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """
+        Non-blocking variant of acquire for asyncio callers.
+
+        Returns:
+            bool: True if a request may be sent now.
+        """
+        with self._condition:
+            if self._in_flight >= int(self.limit):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, throttled: bool = False):
+        """
+        Finishes a request and adapts the limit.
+
+        Parameters:
+            throttled (bool): Whether the server answered with a throttling status.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+                logger.warning(f"Throttled by the server, concurrency limit lowered to {int(self.limit)}")
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+class HttpClient():
+    def __init__(
+        self,
+        requests_per_second: float = 10,
+        max_concurrency: int = 16,
+        initial_concurrency: int = 4,
+        max_attempts: int = 5,
+        max_backoff: float = 60,
+        timeout: float = 60,
+    ):
+        """
+        HTTP access layer shared by LawScrapper and LegalActSummarizer. Every request goes through one
+        pooled session, a token bucket limiting the request rate and an AIMD concurrency limit. Throttling
+        (429/503) and temporary server errors are retried with jittered exponential backoff, waiting
+        as long as the server asks in Retry-After when it sends one. arequest applies the same limits
+        and retries to httpx requests of asyncio code (see pipeline.AsyncPipeline).
+
+        Parameters:
+            requests_per_second (float): Sustained request rate; bursts up to one second's worth are allowed.
+            max_concurrency (int): Highest number of requests in flight.
+            initial_concurrency (int): Requests in flight allowed before the limit adapts.
+            max_attempts (int): Attempts per request, including the first one.
+            max_backoff (float): Longest wait between attempts in seconds.
+            timeout (float): Timeout of a single attempt in seconds.
+        """
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.rate_limiter = TokenRateLimiter(int(requests_per_second * 60), capacity=max(1, int(requests_per_second)))
+        self.concurrency = AdaptiveConcurrency(initial=min(initial_concurrency, max_concurrency), maximum=max_concurrency)
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._backoff = wait_random_exponential(multiplier=0.5, max=max_backoff)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request, see request.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a request with rate limiting, adaptive concurrency and retries.
+
+        Parameters:
+            method (str): HTTP method.
+            url (str): URL.
+            **kwargs: Arguments of requests.Session.request (params, headers, stream, ...).
+
+        Returns:
+            requests.Response: The first response that is not retryable, or the last one once all
+            attempts are used. Streamed responses must be closed by the caller (use it as a context manager).
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed without a response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        retrying = Retrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=self._wait,
+            retry=retry_if_exception_type((requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+                | retry_if_result(lambda response: response.status_code in RETRY_STATUSES),
+            before_sleep=self._before_sleep,
+            retry_error_callback=lambda state: state.outcome.result(),
+        )
+        return retrying(self._send, method, url, **kwargs)
+
+    async def arequest(self, client: httpx.AsyncClient, method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+        """
+        Asynchronous variant of request for an httpx client, sharing the rate limit and the
+        concurrency limit with synchronous requests. Waiting for them does not block the event loop.
+
+        Parameters:
+            client (httpx.AsyncClient): Client whose connection pool is used.
+            method (str): HTTP method.
+            url (str): URL.
+            stream (bool): Return before the body is read; the caller must close the response (aclose).
+            **kwargs: Arguments of httpx.AsyncClient.build_request (params, headers, ...).
+
+        Returns:
+            httpx.Response: The first response that is not retryable, or the last one once all attempts are used.
+
+        Raises:
+            httpx.TransportError: If the last attempt failed without a response.
+        """
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=self._wait,
+            retry=retry_if_exception_type(httpx.TransportError)
+                | retry_if_result(lambda response: response.status_code in RETRY_STATUSES),
+            before_sleep=self._log_retry,
+            retry_error_callback=lambda state: state.outcome.result(),
+        )
+        return await retrying(self._asend, method, url, client, stream, **kwargs)
+
+    async def _asend(self, method: str, url: str, client: httpx.AsyncClient, stream: bool, **kwargs) -> httpx.Response:
+        while (wait := self.rate_limiter.try_acquire(1)) > 0:
+            await asyncio.sleep(wait)
+        while not self.concurrency.try_acquire():
+            await asyncio.sleep(0.05)
+        throttled = False
+        try:
+            response = await client.send(client.build_request(method, url, **kwargs), stream=stream)
+            throttled = response.status_code in THROTTLE_STATUSES
+            if stream and response.status_code in RETRY_STATUSES:
+                # Retried or returned as a failure, the body is not needed
+                await response.aclose()
+            return response
+        finally:
+            self.concurrency.release(throttled)
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.rate_limiter.acquire(1)
+        self.concurrency.acquire()
+        throttled = False
+        try:
+            response = self.session.request(method, url, **kwargs)
+            throttled = response.status_code in THROTTLE_STATUSES
+            return response
+        finally:
+            self.concurrency.release(throttled)
+
+    def _wait(self, retry_state) -> float:
+        outcome = retry_state.outcome
+        response = None if outcome.failed else outcome.result()
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return self._backoff(retry_state)
+
+    def _before_sleep(self, retry_state):
+        if not retry_state.outcome.failed:
+            retry_state.outcome.result().close()
+        self._log_retry(retry_state)
+
+    def _log_retry(self, retry_state):
+        outcome = retry_state.outcome
+        reason = repr(outcome.exception()) if outcome.failed else f"HTTP {outcome.result().status_code}"
+        logger.warning(f"Request {retry_state.args[1]} failed ({reason}), retrying in {retry_state.next_action.sleep:.1f}s (attempt {retry_state.attempt_number}/{self.max_attempts})")
@@ -0,0 +1,209 @@
+import os
+import smtplib
+import uuid
+from datetime import datetime
+from email import message_from_bytes
+from email.message import Message
+from email.utils import formatdate, getaddresses, make_msgid
+from dotenv import load_dotenv
+from logger import Logger
+
+logger = Logger(to_file=True).get_logger()
+
+load_dotenv()
+
+SECURITY_MODES = ("ssl", "starttls", "none")
+
+def parse_recipients(value) -> list:
+    """
+    Parses recipients given as a comma-separated string or a list of addresses.
+
+    Returns:
+        list: E-mail addresses.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    return [address for _, address in getaddresses(value) if address]
+
+class Mailer():
+    def __init__(
+        self,
+        server: str = None,
+        port: int = None,
+        user: str = None,
+        password: str = None,
+        sender: str = None,
+        security: str = None,
+        outbox_dir: str = "cache/outbox",
+        timeout: float = 30,
+    ):
+        """
+        SMTP transport keeping one connection open for all messages of a run. A message goes out
+        in a single transaction to all its recipients. A message that cannot be delivered is saved
+        in the outbox directory instead of raising, and flush_outbox resends it on the next run.
+        Arguments left as None are read from the SMTP_* environment variables.
+
+        Parameters:
+            server (str, optional): SMTP server address (SMTP_SERVER).
+            port (int, optional): SMTP server port (SMTP_PORT, default is 465).
+            user (str, optional): SMTP username (SMTP_USER), no login when empty.
+            password (str, optional): SMTP password (SMTP_PASSWORD).
+            sender (str, optional): Envelope sender (SMTP_FROM).
+            security (str, optional): "ssl" (implicit TLS), "starttls" or "none" for a local
+                SMTP stand-in (SMTP_SECURITY, default is "ssl").
+            outbox_dir (str): Directory of messages waiting for delivery.
+            timeout (float): Timeout of SMTP operations in seconds.
+
+        Raises:
+            ValueError: If the port is not a valid integer or security is unknown.
+        """
+        self.server = server or os.getenv("SMTP_SERVER")
+        try:
+            self.port = int(port or os.getenv("SMTP_PORT", 465))
+        except ValueError:
+            raise ValueError("SMTP_PORT must be a valid integer.")
+        self.user = user if user is not None else os.getenv("SMTP_USER")
+        self.password = password if password is not None else os.getenv("SMTP_PASSWORD")
+        self.sender = sender or os.getenv("SMTP_FROM")
+        self.security = (security or os.getenv("SMTP_SECURITY", "ssl")).lower()
+        if self.security not in SECURITY_MODES:
+            raise ValueError(f"SMTP_SECURITY must be one of {SECURITY_MODES}")
+        self.outbox_dir = outbox_dir
+        self.failed_dir = os.path.join(outbox_dir, "failed")
+        self.timeout = timeout
+        self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def send(self, msg: Message) -> bool:
+        """
+        Sends a message to the addresses in its To and Cc headers over the shared connection,
+        reconnecting once if the server dropped it. On failure the message is saved in the outbox.
+
+        Parameters:
+            msg (Message): Message to send; Date and Message-ID are added when missing.
+
+        Returns:
+            bool: True if the message was delivered, False if it was queued in the outbox.
+        """
+        if not msg["Date"]:
+            msg["Date"] = formatdate(localtime=True)
+        if not msg["Message-ID"]:
+            msg["Message-ID"] = make_msgid(domain=(self.sender or "lawscrapper").rpartition("@")[2] or None)
+        if not self._recipients(msg):
+            logger.error(f"Email {msg['Subject']!r} has no recipients, not sent")
+            return False
+        try:
+            self._deliver(msg)
+            return True
+        except (smtplib.SMTPException, OSError) as e:
+            logger.error(f"Email {msg['Subject']!r} not sent ({e!r}), queued in {self.outbox_dir}")
+            self._enqueue(msg)
+            return False
+
+    def flush_outbox(self) -> int:
+        """
+        Resends messages queued by earlier runs, oldest first. Delivered messages are removed,
+        messages rejected permanently (5xx) are moved to the failed subdirectory, and the rest
+        stay queued for the next run.
+
+        Returns:
+            int: Number of delivered messages.
+        """
+        if not os.path.isdir(self.outbox_dir):
+            return 0
+        delivered = 0
+        for name in sorted(name for name in os.listdir(self.outbox_dir) if name.endswith(".eml")):
+            path = os.path.join(self.outbox_dir, name)
+            with open(path, "rb") as f:
+                msg = message_from_bytes(f.read())
+            try:
+                self._deliver(msg)
+            except smtplib.SMTPResponseException as e:
+                if 500 <= e.smtp_code < 600:
+                    logger.error(f"Queued email {msg['Subject']!r} rejected ({e.smtp_code}), moved to {self.failed_dir}")
+                    os.makedirs(self.failed_dir, exist_ok=True)
+                    os.replace(path, os.path.join(self.failed_dir, name))
+                    continue
+                logger.warning(f"Queued email {msg['Subject']!r} still not sent ({e!r})")
+                break
+            except (smtplib.SMTPException, OSError) as e:
+                logger.warning(f"Queued email {msg['Subject']!r} still not sent ({e!r})")
+                break
+            os.remove(path)
+            delivered += 1
+        if delivered:
+            logger.info(f"Delivered {delivered} queued emails from {self.outbox_dir}")
+        return delivered
+
+    def close(self):
+        """
+        Closes the SMTP connection if it is open.
+        """
+        if self._connection is None:
+            return
+        try:
+            self._connection.quit()
+        except (smtplib.SMTPException, OSError):
+            self._connection.close()
+        self._connection = None
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._connection is not None:
+            return self._connection
+        if self.security == "ssl":
+            connection = smtplib.SMTP_SSL(self.server, self.port, timeout=self.timeout)
+        else:
+            connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        try:
+            if self.security == "starttls":
+                connection.starttls()
+            if self.user:
+                connection.login(self.user, self.password)
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+            raise
+        self._connection = connection
+        return connection
+
+    def _recipients(self, msg: Message) -> list:
+        return parse_recipients(msg.get_all("To", []) + msg.get_all("Cc", []))
+
+    def _deliver(self, msg: Message):
+        recipients = self._recipients(msg)
+        # Raw bytes keep a queued message identical to the one rendered by the original run
+        data = msg.as_bytes()
+        for attempt in range(2):
+            try:
+                refused = self._connect().sendmail(self.sender or msg["From"], recipients, data)
+                break
+            except smtplib.SMTPServerDisconnected:
+                # Idle connections are dropped by servers, reconnect once
+                self._connection = None
+                if attempt:
+                    raise
+            except smtplib.SMTPResponseException:
+                # The server rejected this message but the session is still usable
+                raise
+            except OSError:
+                # Network error or protocol failure, open a new connection for the next message
+                self.close()
+                raise
+        if refused:
+            logger.warning(f"Email {msg['Subject']!r} refused for {', '.join(refused)}")
+        logger.info(f"Email sent to {', '.join(address for address in recipients if address not in refused)} with subject: {msg['Subject']}")
+
+    def _enqueue(self, msg: Message):
+        # Timestamped names keep the outbox in sending order; the rename makes a queued file complete or absent
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        path = os.path.join(self.outbox_dir, f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}.eml")
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(msg.as_bytes())
+        os.replace(temporary, path)
@@ -9,21 +9,142 @@ License: MIT
 
 __version__ = "1.1.1"
 
-from typing import Literal
+from typing import Annotated
 from typing_extensions import TypedDict
 from send_notification import send_notification
+from mailer import Mailer
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+from langgraph.checkpoint.sqlite import SqliteSaver
 from dotenv import load_dotenv
 from scrapper import LawScrapper
-from model import LegalActSummarizer
+from http_client import HttpClient
+from model import SUMMARY_UNAVAILABLE, LegalActSummarizer
+from dedup import NearDuplicateIndex
+from document_cache import DocumentCache
+from pdf_text import PdfExtractor
+from pipeline import AsyncPipeline
+from summary_store import SummaryStore
+from run_state import RunState
+from rate_limit import TokenRateLimiter
+from profiles import load_profiles, matches, select_acts, union_keywords
+from relevance import RelevanceScorer, act_document, load_vocabulary
+from scheduler import RunBudget, prioritize, run_with_timeout
+from digest import DigestRenderer
 from logger import Logger
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import operator
+import os
+import sqlite3
 
 logger = Logger(to_file=False).get_logger()
 
-scrapper = LawScrapper()
-
 load_dotenv()
 
+# All Sejm API and document requests share one rate limit, retry policy and adaptive concurrency limit
+http_client = HttpClient(
+    requests_per_second=float(os.getenv("SEJM_API_RPS", 10)),
+    max_concurrency=int(os.getenv("SEJM_API_MAX_CONCURRENCY", 16)),
+)
+scrapper = LawScrapper(http_client=http_client)
+
+document_cache = DocumentCache(
+    directory=os.getenv("DOCUMENT_CACHE_DIR", "cache/documents"),
+    max_size_mb=float(os.getenv("DOCUMENT_CACHE_MAX_MB", 500)),
+)
+pdf_extractor = PdfExtractor(
+    workers=int(os.getenv("PDF_WORKERS", 0)) or None,
+    timeout=float(os.getenv("PDF_TIMEOUT", 120)),
+)
+# Acts are summarized concurrently, sharing one tokens-per-minute budget for the OpenAI API
+max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+rate_limiter = TokenRateLimiter(int(os.getenv("OPENAI_TPM_LIMIT", 200000)))
+database_url = os.getenv("DATABASE_URL", "sqlite:///cache/lawscrapper.db")
+summary_store = SummaryStore(database_url)
+# Near-duplicates of summarized acts (e.g. consolidated texts) reuse the stored summary, 0 disables the check
+duplicate_threshold = float(os.getenv("DUPLICATE_THRESHOLD", 0.9))
+duplicate_index = NearDuplicateIndex(database_url, threshold=duplicate_threshold) if duplicate_threshold > 0 else None
+
+# One summarizer, and with it one LLM client, HTTP session and set of prompt templates, serves every act
+summarizer = LegalActSummarizer(
+    document_cache=document_cache,
+    summary_store=summary_store,
+    max_document_mb=float(os.getenv("MAX_DOCUMENT_MB", 50)),
+    content_source=os.getenv("CONTENT_SOURCE", "auto"),
+    pdf_extractor=pdf_extractor,
+    rate_limiter=rate_limiter,
+    extract_max_tokens=int(os.getenv("EXTRACT_MAX_TOKENS", 120000)) or None,
+    normalize=os.getenv("NORMALIZE_TEXT", "true").lower() == "true",
+    duplicate_index=duplicate_index,
+    http_client=http_client,
+)
+
+# Acts scoring below the relevance threshold against the profile vocabulary are listed by title only
+relevance_threshold = float(os.getenv("RELEVANCE_THRESHOLD", 2.0))
+relevance_first_pages = os.getenv("RELEVANCE_FIRST_PAGES", "true").lower() == "true"
+relevance_vocabulary = load_vocabulary(os.getenv("RELEVANCE_VOCABULARY")) if os.getenv("RELEVANCE_VOCABULARY") else None
+
+# Per-act work stops after RUN_BUDGET_SECONDS so the digest is sent before the job is killed,
+# acts that did not finish are listed as "summary pending" and carried over to the next run.
+# The clock starts here, before acts are fetched, scored and summarized
+run_budget = RunBudget(
+    seconds=float(os.getenv("RUN_BUDGET_SECONDS", 2700)) or None,
+    act_timeout=float(os.getenv("ACT_TIMEOUT_SECONDS", 600)) or None,
+)
+
+# Batch mode summarizes all acts with the cheaper OpenAI Batch API instead of one synchronous call per act
+batch_mode = os.getenv("LLM_BATCH_MODE", "false").lower() == "true"
+
+# The asyncio pipeline overlaps downloads, extraction and LLM calls in stages connected by bounded queues
+async_pipeline = os.getenv("ASYNC_PIPELINE", "false").lower() == "true"
+pipeline = AsyncPipeline(
+    scrapper,
+    summarizer,
+    download_workers=int(os.getenv("PIPELINE_DOWNLOAD_WORKERS", 8)),
+    extract_workers=int(os.getenv("PIPELINE_EXTRACT_WORKERS", 4)),
+    llm_workers=max_concurrency,
+    http_client=http_client,
+    act_timeout=run_budget.act_timeout,
+)
+
+# Incremental runs fetch only acts newer than the last successful run instead of a fixed 7-day window
+incremental = os.getenv("INCREMENTAL_RUNS", "true").lower() == "true"
+run_state = RunState(
+    database_url,
+    overlap_days=int(os.getenv("INCREMENTAL_OVERLAP_DAYS", 3)),
+)
+
+DEFAULT_KEYWORDS = [
+    "bhp",
+    "przeciwpożarowa ochrona",
+    "czynniki szkodliwe dla zdrowia",
+    "dozór techniczny",
+    "hałas i wibracje",
+    "inspekcja pracy",
+    "odzież ochronna, robocza i sprzęt ochrony osobistej",
+    "ochotnicza straż pożarna",
+    "Państwowa Straż Pożarna",
+    "Straż Pożarna",
+    "warunki sanitarne",
+    "warunki szkodliwe",
+    "warunki uciążliwe",
+    "wypadki przy pracy"
+]
+
+# Subscriber profiles share one fetch and summarization pass; each gets its own digest
+profiles = load_profiles(os.getenv("PROFILES_FILE"), default_keywords=DEFAULT_KEYWORDS)
+relevance_scorers = {profile["name"]: RelevanceScorer(profile["vocabulary"] or relevance_vocabulary) for profile in profiles}
+
+# One SMTP connection for all e-mails of a run; undelivered e-mails wait in the outbox for the next run
+mailer = Mailer(outbox_dir=os.getenv("OUTBOX_DIR", "cache/outbox"))
+
+# Digests larger than the cap are split into several e-mails or sent with the full list attached
+digest_renderer = DigestRenderer(
+    max_bytes=int(float(os.getenv("DIGEST_MAX_KB", 100)) * 1024),
+    overflow=os.getenv("DIGEST_OVERFLOW", "paginate"),
+)
+
 class State(TypedDict):
     """
     This module defines a LangGraph-based workflow for fetching recent legal acts,
@@ -31,7 +152,15 @@ class State(TypedDict):
     """
     keywords: list
     acts: list
-    current_act: int
+    summaries: Annotated[list, operator.add]
+    window_end: str
+
+class ActTask(TypedDict):
+    """
+    Input of a single process_act branch: one act and its position in the digest.
+    """
+    index: int
+    act: dict
 
 def no_acts_notification(state: State) -> State:
     """
@@ -44,41 +173,172 @@ def no_acts_notification(state: State) -> State:
         State: Unchanged state after notification.
     """
     logger.info("Sending notification...")
+    for profile in profiles:
+       send_no_acts(profile)
+    mark_window_processed(state)
+    return state
+
+def profile_subject(subject: str, profile: dict) -> str:
+    """
+    Appends the profile name to an e-mail subject when the run serves several profiles.
+    """
+    return f"{subject} [{profile['name']}]" if len(profiles) > 1 else subject
+
+def send_no_acts(profile: dict):
+    """
+    Sends the "no new acts" e-mail to the recipients of a profile.
+
+    Parameters:
+        profile (dict): Profile to notify.
+    """
     send_notification(
-        subject="[LawScrapper] Brak nowych aktów prawnych",
+        subject=profile_subject("[LawScrapper] Brak nowych aktów prawnych", profile),
         title="Brak nowych aktów prawnych",
-        body="Brak nowych aktów prawnych w wybranym zakresie dat lub zgodnie z ustawionym słowem kluczowym"
+        body="Brak nowych aktów prawnych w wybranym zakresie dat lub zgodnie z ustawionym słowem kluczowym",
+        recipients=profile["recipients"],
+        mailer=mailer
     )
-    return state
 
-def process_act(state: State) -> State:
+def mark_window_processed(state: State):
+    """
+    Records the acts of a delivered digest as processed and advances the high-water mark,
+    so the next incremental run starts where this one ended. Acts whose summary is pending
+    or failed are carried over to the next run instead. Runs that are not incremental carry
+    nothing over, so these acts are logged.
+
+    Parameters:
+        state (State): Workflow state after the notification was sent.
+    """
+    acts = state.get("acts") or []
+    if incremental and state.get("window_end"):
+        run_state.mark_processed([act for act in acts if not needs_retry(act)], datetime.fromisoformat(state["window_end"]))
+        run_state.set_pending([act for act in acts if needs_retry(act)])
+    elif not incremental:
+        dropped = [act.get("eli") for act in acts if needs_retry(act)]
+        if dropped:
+            logger.warning(f"{len(dropped)} acts without a summary are not carried over (INCREMENTAL_RUNS=false): {', '.join(map(str, dropped))}")
+
+def needs_retry(act: dict) -> bool:
+    """
+    Checks whether an act has to be summarized again by a later run: its summary is pending,
+    unavailable or an error message. Acts below the relevance threshold are never summarized.
+    """
+    if act.get("pending"):
+        return True
+    if act.get("relevant") is False:
+        return False
+    summary = act.get("summary")
+    return summary is None or summary == SUMMARY_UNAVAILABLE or summary.startswith("Error:")
+
+def process_act(task: ActTask) -> dict:
     """
-    Processes the current act in the state by downloading its PDF content,
-    summarizing it with the LegalActSummarizer (LLM), and storing the result.
+    Processes a single act by downloading its content and summarizing it with the
+    LegalActSummarizer (LLM). Runs as one branch of the fan-out created by has_new_acts.
+    The act gets at most the per-act timeout, capped by what is left of the run budget;
+    an act that does not finish in time is marked as pending.
 
     Parameters:
-        state (State): Workflow state containing the list of acts and the current index.
+        task (ActTask): The act to process and its index in the list of acts.
 
     Returns:
-        State: Updated state with summary for the current act and incremented index.
+        dict: State update appending (index, result) to the collected summaries, where result
+        holds the summary and the tokens spent on it.
     """
-    logger.info(f'{(state["current_act"] + 1)}/{len(state["acts"])} Processing act... ')
-    act = state["acts"][state["current_act"]]
-    summarizer = LegalActSummarizer()
+    act = task["act"]
+    if run_budget.expired():
+        logger.warning(f'Run budget spent, summary of {act.get("eli")} is pending')
+        return {"summaries": [(task["index"], {"summary": None, "tokens": None, "pending": True})]}
+
+    logger.info(f'Processing act {task["index"] + 1}: {act.get("eli")}')
+    def summarize_act(act: dict) -> dict:
+        content = summarizer.get_act_text(act)
+        if not content:
+            logger.error(f'No text could be extracted for {act.get("eli")}')
+            return {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
+        return summarizer.summarize(content, eli=act["eli"])
+
     try:
-        content = summarizer.get_act_content(act["pdf"])
-        summary = summarizer.process_with_llm(content)
+        result = run_with_timeout(summarize_act, run_budget.timeout_for_act(), act)
+    except TimeoutError as e:
+        logger.warning(f'Summary of {act.get("eli")} is pending: {e}')
+        result = {"summary": None, "tokens": None, "pending": True}
     except Exception as e:
         logger.error(f"Error while summarizing act: {e}")
-        summary = "Summary unavailable"
+        result = {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
 
-    act["summary"] = summary
-    state["current_act"] = state["current_act"] + 1
-    return state
+    return {"summaries": [(task["index"], result)]}
+
+def process_acts_batch(state: State) -> dict:
+    """
+    Batch mode alternative to the process_act fan-out: extracts the text of all acts and summarizes
+    them in a single OpenAI batch, falling back to synchronous calls for acts the batch did not finish.
+
+    Parameters:
+        state (State): Workflow state with the acts to summarize.
+
+    Returns:
+        dict: State update with the collected (index, result) pairs.
+    """
+    acts = [(index, act) for index, act in enumerate(state["acts"]) if act.get("relevant", True)]
+    def get_text(act: dict) -> str:
+        try:
+            return summarizer.get_act_text(act)
+        except Exception as e:
+            logger.error(f"Error while extracting act {act.get('eli')}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        texts = list(executor.map(get_text, [act for _, act in acts]))
+
+    results = summarizer.summarize_batch(
+        {act["eli"]: text for (_, act), text in zip(acts, texts)},
+        poll_interval=float(os.getenv("LLM_BATCH_POLL_SECONDS", 60)),
+        deadline=float(os.getenv("LLM_BATCH_DEADLINE_SECONDS", 6 * 3600)),
+        budget=run_budget,
+    )
+    return {"summaries": [(index, results.get(act["eli"])) for index, act in acts]}
+
+def process_acts_async(state: State) -> dict:
+    """
+    Asyncio pipeline alternative to the process_act fan-out: downloads, extracts and summarizes
+    the relevant acts in overlapping stages. Acts not finished within the run budget are pending.
+
+    Parameters:
+        state (State): Workflow state with the acts to summarize.
+
+    Returns:
+        dict: State update with the collected (index, result) pairs.
+    """
+    tasks = prioritize([(index, act) for index, act in enumerate(state["acts"]) if act.get("relevant", True)])
+    processed = pipeline.run(acts=[act for _, act in tasks], deadline=run_budget.remaining())
+    return {"summaries": [(index, {"summary": act["summary"], "tokens": act["tokens"], "pending": act["pending"]}) for (index, _), act in zip(tasks, processed)]}
+
+def collect_summaries(state: State) -> dict:
+    """
+    Joins the parallel process_act branches: attaches every summary and its token usage to its act,
+    keeping the original order of acts regardless of the order in which branches finished.
+
+    Parameters:
+        state (State): Workflow state with acts and the collected (index, result) pairs.
+
+    Returns:
+        dict: State update with summarized acts.
+    """
+    results = dict(state.get("summaries") or [])
+    acts = []
+    for index, act in enumerate(state["acts"]):
+        result = results.get(index) or {}
+        acts.append({**act, "summary": result.get("summary"), "tokens": result.get("tokens"), "pending": result.get("pending", False)})
+
+    spent = [act["tokens"] for act in acts if act["tokens"]]
+    logger.info(f"Tokens spent: {sum(t['input'] for t in spent)} input, {sum(t['output'] for t in spent)} output in {sum(t['calls'] for t in spent)} calls, {sum(t.get('saved', 0) for t in spent)} saved by normalization")
+    return {"acts": acts}
 
 def get_new_acts(state: State) -> State:
     """
-    Fetches new legal acts from the last week based on the provided keyword.
+    Fetches new legal acts based on the provided keyword. In incremental mode the window starts
+    at the last successful run (minus a small overlap) and acts already sent are skipped;
+    otherwise acts from the last week are fetched. Acts left pending by the previous run are added.
 
     Parameters:
         state (State): Workflow state with keyword input.
@@ -89,30 +349,116 @@ def get_new_acts(state: State) -> State:
     keywords = None
     if (state["keywords"]): 
        keywords = state["keywords"]
-    acts = scrapper.get_acts_from_last_week(keywords=keywords)
-    state["acts"] = scrapper.get_formatted_list()
+
+    if not incremental:
+        acts = scrapper.get_acts_from_last_week(keywords=keywords)
+        state["acts"] = scrapper.get_formatted_list()
+        return state
+
+    date_to = datetime.now()
+    date_from = run_state.get_window_start(default=date_to - timedelta(days=7))
+    logger.info(f"Incremental window: {date_from:%Y-%m-%d} - {date_to:%Y-%m-%d}")
+    acts = run_state.filter_new(list(scrapper.iter_acts(date_from, date_to, keywords)))
+    fetched = {act["eli"] for act in acts}
+    carried = [act for act in run_state.get_pending() if act["eli"] not in fetched]
+    if carried:
+        logger.info(f"{len(carried)} acts with pending summaries carried over from the previous run")
+    state["acts"] = carried + acts
+    state["window_end"] = date_to.isoformat()
     return state
 
-def has_new_acts(state: State)->Literal["no_acts_notification", "process_act"]:
+def score_acts(state: State) -> dict:
+    """
+    Scores the fetched acts against the vocabulary of every profile whose keywords they match,
+    before any LLM call. Acts are scored on their title first; acts below the threshold
+    for all their profiles are scored again with the beginning of their text (extracted with the
+    summarizer, so the cached text is reused for summarization, and within the run budget). Acts still below the threshold
+    for all their profiles are marked as not relevant and are not summarized.
+
+    Parameters:
+        state (State): Workflow state with fetched acts.
+
+    Returns:
+        dict: State update with acts carrying "relevance" (best score), "profile_relevance"
+        (score per matching profile) and "relevant".
+    """
+    acts = state.get("acts") or []
+    if not acts or relevance_threshold <= 0:
+        return {"acts": acts}
+
+    # Acts matching no profile (possible only with several profiles) are scored for all of them
+    act_profiles = [[profile["name"] for profile in profiles if matches(act, profile)] or list(relevance_scorers) for act in acts]
+    documents = [act_document(act) for act in acts]
+    scores = {name: scorer.score_all(documents) for name, scorer in relevance_scorers.items()}
+    def best(index: int) -> float:
+        return max(scores[name][index] for name in act_profiles[index])
+
+    low = [index for index in range(len(acts)) if best(index) < relevance_threshold]
+    if low and relevance_first_pages:
+        # Extraction counts against the run budget: an act is scored on its title once the budget is spent
+        def get_text(act: dict) -> str:
+            if run_budget.expired():
+                return None
+            try:
+                return run_with_timeout(summarizer.get_act_text, run_budget.timeout_for_act(), act)
+            except TimeoutError as e:
+                logger.warning(f"Text of {act.get('eli')} not scored: {e}")
+                return None
+            except Exception as e:
+                logger.error(f"Error while extracting act {act.get('eli')}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            texts = list(executor.map(get_text, [acts[index] for index in low]))
+        documents = [act_document(acts[index], text) for index, text in zip(low, texts)]
+        for name, scorer in relevance_scorers.items():
+            for index, score in zip(low, scorer.score_all(documents)):
+                scores[name][index] = max(scores[name][index], score)
+
+    acts = [
+        {
+            **act,
+            "relevance": round(best(index), 2),
+            "profile_relevance": {name: round(scores[name][index], 2) for name in act_profiles[index]},
+            "relevant": best(index) >= relevance_threshold,
+        }
+        for index, act in enumerate(acts)
+    ]
+    logger.info(f"{sum(act['relevant'] for act in acts)} of {len(acts)} acts are relevant (threshold {relevance_threshold})")
+    return {"acts": acts}
+
+def has_new_acts(state: State):
     """
     Decision function for LangGraph:
-    Determines if there are any acts to process.
+    Determines if there are any acts to process and fans them out to parallel process_act branches,
+    most relevant and cheapest acts first.
 
     Parameters:
         state (State): Workflow state.
 
     Returns:
-        str: "process_act" if acts exist, otherwise "no_acts_notification".
+        str or list: Send objects for process_act, one per relevant act, "process_acts_batch" in batch mode,
+        "process_acts_async" in pipeline mode,
+        "collect_summaries" when no act is relevant, or "no_acts_notification".
     """
-    if state.get("acts"):
-      return "process_act"
-    else:
+    if not state.get("acts"):
       return "no_acts_notification"
+    relevant = [(index, act) for index, act in enumerate(state["acts"]) if act.get("relevant", True)]
+    if not relevant:
+      return "collect_summaries"
+    elif batch_mode:
+      return "process_acts_batch"
+    elif async_pipeline:
+      return "process_acts_async"
+    else:
+      return [Send("process_act", {"index": index, "act": act}) for index, act in prioritize(relevant)]
 
 def prepare_summary_notification(state: State) -> State:
     """
     Prepares and sends a summary notification email containing a formatted HTML table
-    with all processed acts and their summaries.
+    with all processed acts and their summaries. Acts below the relevance threshold are listed by title only.
+    Each profile gets its own digest with the acts matching its keywords; a profile without matching acts
+    gets the "no new acts" e-mail.
 
     Parameters:
         state (State): Workflow state containing processed legal acts.
@@ -121,141 +467,86 @@ def prepare_summary_notification(state: State) -> State:
         State: Unchanged state after sending summary.
     """
     logger.info("Sending notification...")
-    rows = ""
-    for index, act in enumerate(state.get("acts"), 1):
-       rows += f"""<tr style="">
-            <td class="text-xs"
-                style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border: 1px solid #e2e8f0;"
-                align="left" valign="top">{index}</td>
-            <td class="text-xs"
-                style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border: 1px solid #e2e8f0;"
-                align="left" valign="top">{act.get('title')}</td>
-            <td class="text-xs"
-                style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border: 1px solid #e2e8f0;"
-                align="left" valign="top">{act.get('summary')}</td>
-            <td class="text-xs"
-                style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border: 1px solid #e2e8f0;"
-                align="left" valign="top">{act.get('promulgation')}</td>
-            <td class="text-xs"
-                style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border: 1px solid #e2e8f0;"
-                align="left" valign="top">{act.get('announcementDate')}</td>
-            <td class="text-xs"
-                style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border: 1px solid #e2e8f0;"
-                align="left" valign="top">{act.get('entryIntoForce')}</td>
-            <td class="text-xs"
-                style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border: 1px solid #e2e8f0;"
-                align="left" valign="top">{act.get('keywords')}</td>
-            <td class="text-xs"
-                style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border: 1px solid #e2e8f0;"
-                align="left" valign="top">
-                <table class="btn btn-primary" role="presentation" border="0" cellpadding="0" cellspacing="0"
-                    style="border-radius: 6px; border-collapse: separate !important;">
-                    <tbody>
-                        <tr>
-                            <td style="line-height: 24px; font-size: 12px; border-radius: 6px; margin: 0;"
-                                align="center" bgcolor="#0d6efd">
-                                <a href="{act.get('pdf') if act.get('pdf') else act.get('html')}"
-                                    style="color: #ffffff; font-size: 12px; font-family: Helvetica, Arial, sans-serif; text-decoration: none; border-radius: 6px; line-height: 20px; display: block; font-weight: normal; white-space: nowrap; background-color: #0d6efd; padding: 8px 12px; border: 1px solid #0d6efd;">Pokaż</a>
-                            </td>
-                        </tr>
-                    </tbody>
-                </table>
-            </td>
-        </tr>"""
-    
-    table = f""" <table class="table table-striped table-bordered" border="0" cellpadding="0" cellspacing="0"
-        style="width: 100%; max-width: 100%; border: 1px solid #e2e8f0;">
-        <thead>
-            <tr>
-                <th class="text-xs"
-                    style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border-color: #e2e8f0; border-style: solid; border-width: 1px 1px 2px;"
-                    align="left" valign="top">L.p</th>
-                <th class="text-xs"
-                    style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border-color: #e2e8f0; border-style: solid; border-width: 1px 1px 2px;"
-                    align="left" valign="top">Tytu&#322; aktu</th>
-                <th class="text-xs"
-                    style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border-color: #e2e8f0; border-style: solid; border-width: 1px 1px 2px;"
-                    align="left" valign="top">Podsumowanie</th>
-                <th class="text-xs"
-                    style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border-color: #e2e8f0; border-style: solid; border-width: 1px 1px 2px;"
-                    align="left" valign="top">Data og&#322;oszenia</th>
-                <th class="text-xs"
-                    style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border-color: #e2e8f0; border-style: solid; border-width: 1px 1px 2px;"
-                    align="left" valign="top">Data wydania</th>
-                <th class="text-xs"
-                    style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border-color: #e2e8f0; border-style: solid; border-width: 1px 1px 2px;"
-                    align="left" valign="top">Data wej&#347;cia w &#380;ycie</th>
-                <th class="text-xs"
-                    style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border-color: #e2e8f0; border-style: solid; border-width: 1px 1px 2px;"
-                    align="left" valign="top">S&#322;owa kluczowe</th>
-                <th class="text-xs"
-                    style="line-height: 14.4px; font-size: 12px; margin: 0; padding: 12px; border-color: #e2e8f0; border-style: solid; border-width: 1px 1px 2px;"
-                    align="left" valign="top">Tre&#347;&#263; aktu</th>
-            </tr>
-        </thead>
-        <tbody>
-            {rows}
-        </tbody>
-    </table>"""
-    
-    send_notification(
-        subject="[LawScrapper] Zmiany prawne w ostatnim tygodniu",
-        title="Lista aktów prawnych, które weszły w życie w ostatnim tygodniu",
-        body= "Poniżej lista aktów prawnych, które weszły w życie w ostatnim tygodniu",
-        table = table
-    )
+    subject = "[LawScrapper] Zmiany prawne w ostatnim tygodniu"
+    body = "Poniżej lista aktów prawnych, które weszły w życie w ostatnim tygodniu"
+    for profile in profiles:
+       # Every profile's digest is rendered from the acts summarized once for the whole run
+       acts = select_acts(state.get("acts"), profile, relevance_threshold) if len(profiles) > 1 else state.get("acts")
+       logger.info(f"Profile {profile['name']}: {len(acts)} acts")
+       if not acts:
+          send_no_acts(profile)
+          continue
+       parts = digest_renderer.render(acts)
+       for part in parts:
+          part_body = body
+          if part["attachments"]:
+             part_body += f". Pokazano {part['shown']} z {len(acts)} aktów, pełna lista znajduje się w załączniku"
+          part_subject = profile_subject(subject, profile)
+          send_notification(
+              subject=f"{part_subject} ({part['page']}/{part['pages']})" if part["pages"] > 1 else part_subject,
+              title="Lista aktów prawnych, które weszły w życie w ostatnim tygodniu",
+              body=part_body,
+              table=part["table"],
+              attachments=part["attachments"],
+              recipients=profile["recipients"],
+              mailer=mailer
+          )
+    mark_window_processed(state)
     return state
   
-def has_more_acts(state: State)->Literal["prepare_summary_notification", "process_act"]:
-    """
-    Decision function for LangGraph:
-    Determines whether there are more acts to process.
-
-    Parameters:
-        state (State): Workflow state containing the list and current act index.
-
-    Returns:
-        str: "process_act" if more acts are left, otherwise "prepare_summary_notification".
-    """
-    if state.get("current_act") < len(state.get("acts")):
-      return "process_act"
-    else:
-      return "prepare_summary_notification"
-
 workflow = StateGraph(State)
 
 workflow.add_node("get_new_acts", get_new_acts)
 workflow.add_node("no_acts_notification", no_acts_notification)
+workflow.add_node("score_acts", score_acts)
 workflow.add_node("process_act", process_act)
+workflow.add_node("process_acts_batch", process_acts_batch)
+workflow.add_node("process_acts_async", process_acts_async)
+workflow.add_node("collect_summaries", collect_summaries)
 workflow.add_node("prepare_summary_notification", prepare_summary_notification)
-workflow.add_conditional_edges("get_new_acts", has_new_acts)
-workflow.add_conditional_edges("process_act", has_more_acts)
+workflow.add_edge("get_new_acts", "score_acts")
+workflow.add_conditional_edges("score_acts", has_new_acts, ["no_acts_notification", "process_act", "process_acts_batch", "process_acts_async", "collect_summaries"])
+workflow.add_edge("process_act", "collect_summaries")
+workflow.add_edge("process_acts_batch", "collect_summaries")
+workflow.add_edge("process_acts_async", "collect_summaries")
+workflow.add_edge("collect_summaries", "prepare_summary_notification")
 workflow.add_edge(START, "get_new_acts")
 workflow.add_edge("no_acts_notification", END)
 workflow.add_edge("prepare_summary_notification", END)
 
-graph = workflow.compile()
-
-result = graph.invoke({
-    "acts": [],
-    "current_act": 0,
-    "keywords": [
-        "bhp", 
-        "przeciwpożarowa ochrona",
-        "czynniki szkodliwe dla zdrowia", 
-        "dozór techniczny", 
-        "hałas i wibracje", 
-        "inspekcja pracy",
-        "odzież ochronna, robocza i sprzęt ochrony osobistej", 
-        "ochotnicza straż pożarna",
-        "Państwowa Straż Pożarna", 
-        "Straż Pożarna",
-        "warunki sanitarne", 
-        "warunki szkodliwe", 
-        "warunki uciążliwe", 
-        "wypadki przy pracy"
-    ]
-}, {"recursion_limit": 100})
+# Every superstep and every finished process_act branch is checkpointed, so an interrupted run
+# resumes without repeating acts that were already summarized
+checkpoint_path = os.getenv("CHECKPOINT_DB", "cache/checkpoints.db")
+os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+checkpointer = SqliteSaver(sqlite3.connect(checkpoint_path, check_same_thread=False))
+graph = workflow.compile(checkpointer=checkpointer)
+
+ACTIVE_RUN = "active_run"
+
+if __name__ == "__main__":
+    mailer.flush_outbox()
+    thread_id = run_state.get_value(ACTIVE_RUN)
+    config = {"configurable": {"thread_id": thread_id}, "max_concurrency": max_concurrency}
+    if thread_id and graph.get_state(config).next:
+        logger.info(f"Resuming interrupted run {thread_id}")
+        result = graph.invoke(None, config)
+    else:
+        thread_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        config["configurable"]["thread_id"] = thread_id
+        run_state.set_value(ACTIVE_RUN, thread_id)
+        result = graph.invoke({
+            "acts": [],
+            "summaries": [],
+            "window_end": None,
+            "keywords": union_keywords(profiles)
+        }, config)
+
+    run_state.set_value(ACTIVE_RUN, None)
+    checkpointer.delete_thread(thread_id)
 
-logger.info(f"LawScrapper v{__version__} execution completed")
-logger.info(result)
+    logger.info(f"LawScrapper v{__version__} execution completed")
+    logger.info(f"Summary store: {summary_store.stats()}")
+    logger.info(result)
+    mailer.close()
+    document_cache.close()
+    pdf_extractor.shutdown()
@@ -1,99 +1,823 @@
 from langchain_openai import ChatOpenAI
+from openai import OpenAI
 from dotenv import load_dotenv
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from functools import lru_cache
+import io
+import json
+import re
+import threading
+import time
 import requests
-import os
-from pypdf import PdfReader
+import tiktoken
+from dedup import NearDuplicateIndex
+from document_cache import DocumentCache
+from http_client import HttpClient
+from html_text import html_to_text
+from normalize import PAGE_BREAK, normalize_text
+from pdf_text import PdfExtractor, extract_budgeted, pdf_to_text
+from prompts import PromptRegistry, prompt_registry
+from summary_store import SummaryStore, content_hash
+from rate_limit import TokenRateLimiter
+from scheduler import RunBudget, run_with_timeout
 from logger import Logger
 
 logger = Logger(to_file=True).get_logger()
 
 load_dotenv()
 
+CONTENT_SOURCES = ("auto", "html", "pdf")
+# Generous characters-per-token ratio used to turn a token budget into a character budget for extraction,
+# the extracted text is then trimmed to the exact number of tokens
+CHARS_PER_TOKEN = 4
+# Final states of an OpenAI batch
+BATCH_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+# Listed in the digest for acts that could not be summarized; never stored, so a later run tries again
+SUMMARY_UNAVAILABLE = "Summary unavailable"
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """
+    Returns the tiktoken encoding of a model, falling back to o200k_base for models tiktoken does not know.
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
 class LegalActSummarizer():
-    def __init__(self, model: str = "gpt-4.1-mini-2025-04-14", temperature: float = 0.2, max_tokens: int = 256):
+    def __init__(
+        self,
+        model: str = "gpt-4.1-mini-2025-04-14",
+        temperature: float = 0.2,
+        max_tokens: int = 256,
+        document_cache: DocumentCache = None,
+        summary_store: SummaryStore = None,
+        max_document_mb: float = 50,
+        content_source: str = "auto",
+        pdf_extractor: PdfExtractor = None,
+        rate_limiter: TokenRateLimiter = None,
+        single_call_tokens: int = 30000,
+        chunk_tokens: int = 6000,
+        token_budget: int = 120000,
+        extract_max_tokens: int = None,
+        normalize: bool = True,
+        prompts: PromptRegistry = None,
+        base_url: str = None,
+        duplicate_index: NearDuplicateIndex = None,
+        http_client: HttpClient = None,
+    ):
         """
-        Initializes the LLM summarizer for legal acts using OpenAI via LangChain.
+        Initializes the LLM summarizer for legal acts using OpenAI via LangChain. The summarizer is
+        meant to be long-lived and shared by concurrent threads: the LLM client, the HTTP session
+        used for downloads and the prompt templates are created once and reused for every act.
 
         Parameters:
             model (str): The OpenAI model identifier to use.
             temperature (float): Sampling temperature for the LLM.
             max_tokens (int): Maximum token length for the generated summary.
+            document_cache (DocumentCache, optional): Persistent cache for downloaded documents and extracted text.
+            summary_store (SummaryStore, optional): Persistent store of summaries, reused when the act text,
+                model, temperature and prompt are unchanged. Summaries made with another model or prompt are dropped.
+            max_document_mb (float): Documents larger than this are not downloaded.
+            content_source (str): Which text of an act to summarize: "html" or "pdf" only, or "auto"
+                to prefer the HTML text and fall back to the PDF when HTML is missing or empty.
+            pdf_extractor (PdfExtractor, optional): Process pool used for PDF text extraction.
+                Without it, PDFs are extracted in the calling thread.
+            rate_limiter (TokenRateLimiter, optional): Tokens-per-minute limiter shared by concurrent summarizers.
+            single_call_tokens (int): Acts up to this many tokens are summarized in a single call.
+            chunk_tokens (int): Target size of the chunks longer acts are split into.
+            token_budget (int): Maximum number of act tokens sent to the LLM per act; chunks beyond it are skipped.
+            extract_max_tokens (int, optional): Lazy extraction budget. PDF pages are extracted one by one until
+                about this many tokens were collected, skipping table-only pages and stopping at the first annex
+                (see extract_budgeted). Text beyond the budget is dropped, so a budget below single_call_tokens means longer acts are
+                summarized from their beginning and never chunked; a budget of token_budget extracts no more
+                than can be summarized. None extracts whole documents.
+            normalize (bool): Strip page headers/footers, page numbers, hyphenation and redundant whitespace
+                from the act text before it is sent to the LLM.
+            prompts (PromptRegistry, optional): Prompt templates, defaults to the registry shared by the process.
+            base_url (str, optional): Base URL of the OpenAI API, e.g. a local stand-in for testing.
+                Defaults to the OpenAI API (or OPENAI_BASE_URL).
+            duplicate_index (NearDuplicateIndex, optional): Index of summarized act texts. When an act is a
+                near-duplicate of one summarized before, its stored summary is reused instead of calling the LLM.
+                Requires a summary store.
+            http_client (HttpClient, optional): Rate-limited, retrying HTTP client for document downloads,
+                shared with the scrapper. Defaults to a client of its own.
         """
+        self.duplicate_index = duplicate_index
+        self.base_url = base_url
+        self._batch_client = None
+        self.prompts = prompts or prompt_registry
+        self.normalize = normalize
+        self.extract_max_tokens = extract_max_tokens
+        self.single_call_tokens = single_call_tokens
+        self._usage_lock = threading.Lock()
+        self.chunk_tokens = chunk_tokens
+        self.token_budget = token_budget
+        self.pdf_extractor = pdf_extractor
+        self.rate_limiter = rate_limiter
+        self.max_tokens = max_tokens
+        if content_source not in CONTENT_SOURCES:
+            raise ValueError(f"content_source must be one of {CONTENT_SOURCES}")
+        self.content_source = content_source
+        self.max_document_bytes = int(max_document_mb * 1024 * 1024)
+        self.document_cache = document_cache
+        self.summary_store = summary_store
+        self.model_name = model
+        # One pooled, rate-limited client keeps connections to api.sejm.gov.pl alive between documents
+        self.http = http_client or HttpClient()
+        self.temperature = temperature
+        if extract_max_tokens and extract_max_tokens < single_call_tokens:
+            logger.warning(f"Extraction budget of {extract_max_tokens} tokens is below the single-call limit of {single_call_tokens}, longer acts are truncated instead of chunked")
+        if summary_store:
+            summary_store.invalidate_stale(model, temperature, self.prompt_hash())
         self.model = ChatOpenAI(
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
             timeout=None,
             max_retries=3,
+            base_url=base_url,
         )
 
+    def get_act_text(self, act: dict) -> str:
+        """
+        Returns the text of a formatted act from the configured content source.
+        In "auto" mode the HTML text is used when the act has one, since it is much cheaper
+        to extract than the PDF, and the PDF is used when HTML is missing or yields no text.
+
+        Parameters:
+            act (dict): Formatted act with "html" and "pdf" URLs.
+
+        Returns:
+            str: Extracted plain text, or None if no source could be read.
+        """
+        for url in self.act_sources(act):
+            text = self.get_act_content(url)
+            if text:
+                return text
+            logger.warning(f"No text extracted from {url}")
+        return None
+
+    def act_sources(self, act: dict) -> list:
+        """
+        Returns the document URLs of an act to try, in order, for the configured content source.
+        """
+        sources = {
+            "auto": [act.get("html"), act.get("pdf")],
+            "html": [act.get("html")],
+            "pdf": [act.get("pdf")],
+        }[self.content_source]
+        return [url for url in sources if url]
+
     def get_act_content(self, url: str) -> str:
         """
-        Downloads a legal act from a given PDF URL and extracts its text content.
+        Downloads a legal act from a given PDF or HTML URL and extracts its text content.
+        With a document cache, recently validated documents are served from disk, older ones are
+        revalidated with a conditional request, and extracted text is reused when the document did not change.
 
         Parameters:
-            url (str): URL to the .pdf document.
+            url (str): URL to the .pdf or .html document.
 
         Returns:
-            str: Extracted plain text from the PDF.
+            str: Extracted plain text.
 
         Raises:
-            requests.exceptions.RequestException: If the HTTP request fails.
             PdfReadError: If PDF parsing fails.
         """
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error: {e}")
+        text = self.get_fresh_text(url)
+        if text is not None:
+            return text
+
+        content = self._download(url)
+        if content is None:
             return None
+        return self.extract_text(url, content)
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(response.content)
-            temp_path = tmp_file.name
+    def _text_variant(self) -> str:
+        return f"budget{self.extract_max_tokens}" if self.extract_max_tokens else "text"
 
-        try:
-            reader = PdfReader(temp_path)
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text
-            return text
-        finally:
-            os.remove(temp_path)
+    def get_fresh_text(self, url: str) -> str:
+        """
+        Returns the cached extracted text of a document that was validated recently enough
+        to be used without a request, or None.
+        """
+        cache = self.document_cache
+        key = DocumentCache.key_from_url(url)
+        # Extracted text is stored per content hash, so it is only valid for the cached document
+        if cache and cache.is_fresh(key):
+            return cache.read_text(key, self._text_variant())
+        return None
+
+    def extract_text(self, url: str, content: bytes) -> str:
+        """
+        Extracts the text of a downloaded document, reusing the cached text when the document
+        is unchanged, and trims it to the extraction budget. CPU-bound for PDFs.
+
+        Parameters:
+            url (str): URL of the .pdf or .html document.
+            content (bytes): Document content.
+
+        Returns:
+            str: Extracted plain text.
+
+        Raises:
+            PdfReadError: If PDF parsing fails.
+        """
+        key = DocumentCache.key_from_url(url)
+        cache = self.document_cache
+        variant = self._text_variant()
+        if cache:
+            text = cache.read_text(key, variant)
+            if text is not None:
+                return text
+
+        max_chars = self.extract_max_tokens * CHARS_PER_TOKEN if self.extract_max_tokens else None
+        if url.endswith(".html"):
+            text = html_to_text(content)
+            if max_chars:
+                text = text[:max_chars]
+        elif self.pdf_extractor:
+            text = self.pdf_extractor.extract(content, max_chars)
+        elif max_chars:
+            text = extract_budgeted(content, max_chars)
+        else:
+            text = pdf_to_text(content)
+
+        if text and self.extract_max_tokens:
+            text = self._truncate_tokens(text, self.extract_max_tokens)
+        if cache and text is not None:
+            cache.store_text(key, text, variant)
+        return text
 
-    def process_with_llm(self, content: str) -> str:
+    def _download(self, url: str) -> bytes:
+        """
+        Downloads a document, using the document cache when one is configured.
+
+        Parameters:
+            url (str): URL to the document.
+
+        Returns:
+            bytes: Document content, or None if the download failed.
+        """
+        key = DocumentCache.key_from_url(url)
+        cache = self.document_cache
+
+        content = cache.read(key) if cache and cache.is_fresh(key) else None
+        if content is None:
+            headers = cache.conditional_headers(key) if cache else {}
+            try:
+                with self.http.get(url, headers=headers, stream=True) as response:
+                    response.raise_for_status()
+                    if cache and response.status_code == 304:
+                        logger.info(f"{key} not modified, using cached copy")
+                        cache.touch(key)
+                        content = cache.read(key)
+                    else:
+                        content = self._read_limited(response)
+                        if content is None:
+                            return None
+                        if cache:
+                            cache.store(key, url, content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Error: {e}")
+                return None
+        return content
+
+    def _read_limited(self, response: requests.Response) -> bytes:
+        """
+        Streams a response body into memory, refusing documents larger than max_document_bytes.
+        The Content-Length header is checked before anything is downloaded.
+
+        Parameters:
+            response (requests.Response): Response opened with stream=True.
+
+        Returns:
+            bytes: Response body, or None if the document is too large.
+        """
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > self.max_document_bytes:
+            logger.error(f"Document {response.url} is {int(length)} bytes, limit is {self.max_document_bytes}")
+            return None
+
+        buffer = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            buffer.write(chunk)
+            if buffer.tell() > self.max_document_bytes:
+                logger.error(f"Document {response.url} exceeds {self.max_document_bytes} bytes, download aborted")
+                return None
+        return buffer.getvalue()
+
+    def process_with_llm(self, content: str, eli: str = None) -> str:
         """
         Sends content to the OpenAI LLM and returns a concise summary of the legal act.
+        If a summary store is configured and the ELI is given, a summary of the same text made with
+        the same model, temperature and prompt is returned without calling the LLM.
     
         Parameters:
             content (str): Full plain-text content of the act to summarize.
+            eli (str, optional): ELI of the act, used as part of the summary cache key.
     
         Returns:
             str: Short, context-aware summary (max 200 characters) or None if an error occurs.
         """
+        return self.summarize(content, eli)["summary"]
+
+    def summarize(self, content: str, eli: str = None) -> dict:
+        """
+        Summarizes an act and reports the tokens spent on it. Acts up to single_call_tokens are sent
+        in one call. Longer acts are split on article/section boundaries into chunks of about
+        chunk_tokens, the chunks are summarized in parallel and their summaries are reduced to the
+        final summary. At most token_budget tokens of the act are sent to the LLM. The text is
+        normalized first (see normalize_text) and the tokens saved by normalization are reported.
+
+        Parameters:
+            content (str): Full plain-text content of the act to summarize.
+            eli (str, optional): ELI of the act, used as part of the summary cache key.
+
+        Returns:
+            dict: "summary" (str) and "tokens" with input/output token counts, the number of LLM calls
+            and the act tokens saved by normalization. An act without text gets SUMMARY_UNAVAILABLE
+            without an LLM call.
+        """
+        usage = {"input": 0, "output": 0, "calls": 0, "saved": 0}
+        if self._is_empty(content, eli):
+            return {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
+        key, summary = self._lookup_summary(content, eli)
+        if summary is not None:
+            return {"summary": summary, "tokens": usage}
+
+        content, content_tokens = self._prepare_content(content, eli, usage)
+        if self._is_empty(content, eli):
+            return {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
+        summary, signature = self._reuse_duplicate(content, eli, key)
+        if summary is not None:
+            return {"summary": summary, "tokens": usage}
+        return self._summarize_prepared(content, content_tokens, eli, key, usage, signature)
+
+    def _is_empty(self, content: str, eli: str) -> bool:
+        """
+        Checks whether there is no act text to summarize. Such acts are neither looked up nor stored,
+        since a summary of an empty text would be reused for the act on every later run.
+        """
+        if content and content.strip():
+            return False
+        logger.warning(f"No text to summarize for {eli or 'act'}")
+        return True
+
+    def _lookup_summary(self, content: str, eli: str) -> tuple:
+        """
+        Returns the summary store key of an act and its stored summary (None when there is none).
+        """
+        if not (self.summary_store and eli):
+            return None, None
+        key = (eli, content_hash(content), self.model_name, self.temperature, self.prompt_hash())
+        summary = self.summary_store.get(*key)
+        if summary is not None:
+            logger.info(f"Using stored summary for {eli}")
+        return key, summary
+
+    def _prepare_content(self, content: str, eli: str, usage: dict) -> tuple:
+        """
+        Normalizes the act text when enabled and returns it with its token count,
+        recording the tokens saved by normalization in usage.
+        """
+        content_tokens = self.count_tokens(content)
+        if self.normalize:
+            content = normalize_text(content)
+            normalized_tokens = self.count_tokens(content)
+            usage["saved"] = content_tokens - normalized_tokens
+            if content_tokens:
+                logger.info(f"Normalization saved {usage['saved']} of {content_tokens} tokens ({usage['saved'] / content_tokens:.0%}) for {eli or 'act'}")
+            content_tokens = normalized_tokens
+        elif content:
+            content = content.replace(PAGE_BREAK, "\n")
+        return content, content_tokens
+
+    def _reuse_duplicate(self, content: str, eli: str, key: tuple) -> tuple:
+        """
+        Looks for a previously summarized near-duplicate of an act and reuses its stored summary,
+        recording the reuse in the audit trail and storing the summary under the key of the new act.
+
+        Returns:
+            tuple: Reused summary (None when there is none) and the MinHash signature of the act,
+            which is indexed once the act is summarized.
+        """
+        if not (self.duplicate_index and self.summary_store and eli and content):
+            return None, None
+        signature = self.duplicate_index.signature(content)
+        duplicate_of, similarity = self.duplicate_index.find(signature, exclude=eli)
+        if not duplicate_of:
+            return None, signature
+        summary = self.summary_store.get_latest(duplicate_of, self.model_name, self.temperature, self.prompt_hash())
+        if summary is None:
+            return None, signature
+
+        self.duplicate_index.record(eli, duplicate_of, similarity, "reused")
+        self.duplicate_index.add(eli, signature)
+        if key:
+            self.summary_store.put(*key, summary)
+        return summary, signature
+
+    def _summarize_prepared(self, content: str, content_tokens: int, eli: str, key: tuple, usage: dict, signature: list = None) -> dict:
+        """
+        Summarizes prepared act text synchronously, in one call or chunked, and stores the summary.
+        The MinHash signature, when given, is added to the near-duplicate index.
+        """
+        try:
+            if content_tokens <= self.single_call_tokens:
+                summary = self._summarize_text(content, usage)
+            else:
+                summary = self._summarize_chunked(content, usage)
+        except Exception as e:
+            logger.error(f"Error: {e}")
+            return {"summary": f"Error: {e}", "tokens": usage}
+
+        logger.info(f"Tokens spent on {eli or 'act'}: {usage}")
+        self._store_summary(eli, key, summary, signature)
+        return {"summary": summary, "tokens": usage}
+
+    def _store_summary(self, eli: str, key: tuple, summary: str, signature: list = None):
+        """
+        Stores a new summary and adds the MinHash signature of the act to the near-duplicate index.
+        """
+        if key:
+            self.summary_store.put(*key, summary)
+        if signature:
+            self.duplicate_index.add(eli, signature)
+
+    async def asummarize(self, content: str, eli: str = None) -> dict:
+        """
+        Asynchronous variant of summarize for the asyncio pipeline. LLM calls are awaited with ainvoke,
+        chunk summaries of long acts run concurrently, and the CPU-bound or blocking steps (store lookup,
+        normalization, MinHash) run in the default executor.
+
+        Parameters:
+            content (str): Full plain-text content of the act to summarize.
+            eli (str, optional): ELI of the act, used as part of the summary cache key.
+
+        Returns:
+            dict: "summary" (str) and "tokens", see summarize.
+        """
+        usage = {"input": 0, "output": 0, "calls": 0, "saved": 0}
+        if self._is_empty(content, eli):
+            return {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
+        def prepare() -> tuple:
+            key, summary = self._lookup_summary(content, eli)
+            if summary is not None:
+                return key, summary, None, 0, None
+            prepared, content_tokens = self._prepare_content(content, eli, usage)
+            if self._is_empty(prepared, eli):
+                return key, SUMMARY_UNAVAILABLE, None, 0, None
+            summary, signature = self._reuse_duplicate(prepared, eli, key)
+            return key, summary, prepared, content_tokens, signature
+
+        key, summary, prepared, content_tokens, signature = await asyncio.to_thread(prepare)
+        if summary == SUMMARY_UNAVAILABLE:
+            return {"summary": summary, "tokens": None}
+        if summary is not None:
+            return {"summary": summary, "tokens": usage}
+
         try:
-            system_prompt = self._get_prompt("summary")
+            if content_tokens <= self.single_call_tokens:
+                summary = (await self._ainvoke(self._summary_messages(prepared), usage)).content
+            else:
+                chunk_prompt = self._get_prompt("chunk_summary")
+                responses = await asyncio.gather(*[
+                    self._ainvoke([("system", chunk_prompt), ("user", f"Podsumuj ten fragment aktu prawnego: {chunk}")], usage)
+                    for chunk in self._select_chunks(prepared)
+                ])
+                logger.info(f"Reducing {len(responses)} chunk summaries")
+                summary = (await self._ainvoke(self._summary_messages("\n\n".join(response.content for response in responses)), usage)).content
+        except Exception as e:
+            logger.error(f"Error: {e}")
+            return {"summary": f"Error: {e}", "tokens": usage}
+
+        logger.info(f"Tokens spent on {eli or 'act'}: {usage}")
+        await asyncio.to_thread(self._store_summary, eli, key, summary, signature)
+        return {"summary": summary, "tokens": usage}
+
+    def summarize_batch(self, contents: dict, poll_interval: float = 60, deadline: float = 6 * 3600, budget: RunBudget = None) -> dict:
+        """
+        Summarizes many acts with the OpenAI Batch API, which is cheaper than synchronous calls
+        but may take hours, so it suits scheduled digests. Acts that fit in a single call are written
+        to one JSONL batch, submitted and polled until the batch finishes or the deadline passes.
+        Stored summaries and summaries of near-duplicates are reused, acts needing chunked summarization
+        are summarized synchronously, and every act the batch did not summarize falls back to a synchronous call.
+        With a run budget, the batch is cancelled when the budget is spent, every synchronous call gets the
+        budget's per-act timeout, and acts not summarized in time are returned as pending.
+
+        Parameters:
+            contents (dict): Act text keyed by ELI.
+            poll_interval (float): Seconds between batch status checks.
+            deadline (float): Seconds to wait for the batch before cancelling it.
+            budget (RunBudget, optional): Run budget limiting the batch and the synchronous fallback.
+
+        Returns:
+            dict: Result of summarize (summary and tokens, "pending" for acts out of time) keyed by ELI.
+        """
+        results = {}
+        pending = {}
+        for eli, content in contents.items():
+            usage = {"input": 0, "output": 0, "calls": 0, "saved": 0}
+            if self._is_empty(content, eli):
+                results[eli] = {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
+                continue
+            key, summary = self._lookup_summary(content, eli)
+            if summary is not None:
+                results[eli] = {"summary": summary, "tokens": usage}
+                continue
+            content, content_tokens = self._prepare_content(content, eli, usage)
+            if self._is_empty(content, eli):
+                results[eli] = {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
+                continue
+            summary, signature = self._reuse_duplicate(content, eli, key)
+            if summary is not None:
+                results[eli] = {"summary": summary, "tokens": usage}
+                continue
+            pending[eli] = (content, content_tokens, key, usage, signature)
+
+        if budget is not None and budget.remaining() is not None:
+            deadline = min(deadline, budget.remaining())
+        batched = {eli: item for eli, item in pending.items() if item[1] <= self.single_call_tokens}
+        if batched and deadline > 0:
+            try:
+                summaries = self._run_batch({eli: item[0] for eli, item in batched.items()}, poll_interval, deadline)
+            except Exception as e:
+                logger.error(f"Batch summarization failed: {e}")
+                summaries = {}
+            for eli, (summary, reported) in summaries.items():
+                content, content_tokens, key, usage, signature = pending.pop(eli)
+                usage["calls"] += 1
+                usage["input"] += reported.get("prompt_tokens", 0)
+                usage["output"] += reported.get("completion_tokens", 0)
+                self._store_summary(eli, key, summary, signature)
+                results[eli] = {"summary": summary, "tokens": usage}
+            logger.info(f"Batch summarized {len(summaries)} of {len(batched)} acts")
+
+        if pending:
+            logger.info(f"Summarizing {len(pending)} acts synchronously")
+        for eli, (content, content_tokens, key, usage, signature) in pending.items():
+            if budget is None:
+                results[eli] = self._summarize_prepared(content, content_tokens, eli, key, usage, signature)
+                continue
+            if budget.expired():
+                logger.warning(f"Run budget spent, summary of {eli} is pending")
+                results[eli] = {"summary": None, "tokens": None, "pending": True}
+                continue
+            try:
+                results[eli] = run_with_timeout(self._summarize_prepared, budget.timeout_for_act(), content, content_tokens, eli, key, usage, signature)
+            except TimeoutError as e:
+                logger.warning(f"Summary of {eli} is pending: {e}")
+                results[eli] = {"summary": None, "tokens": None, "pending": True}
+            except Exception as e:
+                logger.error(f"Error while summarizing act {eli}: {e}")
+                results[eli] = {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
+        return results
+
+    def _run_batch(self, contents: dict, poll_interval: float, deadline: float) -> dict:
+        """
+        Submits one chat completion request per act as a batch and waits for its results.
+
+        Parameters:
+            contents (dict): Prepared act text keyed by ELI.
+            poll_interval (float): Seconds between batch status checks.
+            deadline (float): Seconds to wait before the batch is cancelled.
+
+        Returns:
+            dict: (summary, usage) keyed by ELI for the requests that succeeded.
+        """
+        client = self._get_batch_client()
+        elis = list(contents)
+        lines = []
+        for index, eli in enumerate(elis):
+            request = {
+                "custom_id": f"act-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model_name,
+                    "temperature": self.temperature,
+                    "max_tokens": self.max_tokens,
+                    "messages": [{"role": role, "content": text} for role, text in self._summary_messages(contents[eli])],
+                },
+            }
+            lines.append(json.dumps(request, ensure_ascii=False))
+
+        batch_file = client.files.create(file=("acts.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+        batch = client.batches.create(input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h")
+        logger.info(f"Submitted batch {batch.id} with {len(lines)} requests")
+
+        started = time.monotonic()
+        while batch.status not in BATCH_FINAL_STATES:
+            elapsed = time.monotonic() - started
+            if elapsed >= deadline:
+                logger.warning(f"Batch {batch.id} did not finish within {deadline}s, cancelling it")
+                client.batches.cancel(batch.id)
+                return {}
+            # Never sleep past the deadline, it may be the end of the run budget
+            time.sleep(min(poll_interval, deadline - elapsed))
+            batch = client.batches.retrieve(batch.id)
+        logger.info(f"Batch {batch.id} finished with status {batch.status}")
+        if not batch.output_file_id:
+            return {}
+
+        summaries = {}
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            index = int(result["custom_id"].removeprefix("act-"))
+            if result.get("error") or response.get("status_code") != 200:
+                logger.error(f"Batch request for {elis[index]} failed: {result.get('error') or response.get('status_code')}")
+                continue
+            body = response["body"]
+            summaries[elis[index]] = (body["choices"][0]["message"]["content"], body.get("usage") or {})
+        return summaries
+
+    def _get_batch_client(self) -> OpenAI:
+        if self._batch_client is None:
+            self._batch_client = OpenAI(base_url=self.base_url)
+        return self._batch_client
+
+    def _summary_messages(self, content: str) -> list:
+        """
+        Builds the chat messages summarizing a text with the summary prompt.
+        """
+        return [
+            (
+                "system",
+                self._get_prompt("summary")
+            ),
+            ("user", f"Podsumuj ten akt prawny: {content}"),
+            ("assistant", "Oto podsumowanie aktu prawnego:"),
+        ]
+
+    def _summarize_text(self, content: str, usage: dict) -> str:
+        """
+        Summarizes a text in a single call with the summary prompt.
+        """
+        return self._invoke(self._summary_messages(content), usage).content
+
+    def _summarize_chunked(self, content: str, usage: dict) -> str:
+        """
+        Map-reduce summarization of a long act: chunk summaries are produced in parallel
+        and combined with the summary prompt.
+        """
+        selected = self._select_chunks(content)
+        chunk_prompt = self._get_prompt("chunk_summary")
+        def summarize_chunk(chunk: str) -> str:
             messages = [
-                (
-                    "system",
-                    system_prompt
-                ),
-                ("user", f"Podsumuj ten akt prawny: {content}"),
-                ("assistant", "Oto podsumowanie aktu prawnego:"),
+                ("system", chunk_prompt),
+                ("user", f"Podsumuj ten fragment aktu prawnego: {chunk}"),
             ]
+            return self._invoke(messages, usage).content
 
+        with ThreadPoolExecutor(max_workers=min(4, len(selected))) as executor:
+            partial_summaries = list(executor.map(summarize_chunk, selected))
+
+        logger.info(f"Reducing {len(partial_summaries)} chunk summaries")
+        return self._summarize_text("\n\n".join(partial_summaries), usage)
+
+    def _select_chunks(self, content: str) -> list:
+        """
+        Splits an act into chunks and keeps the leading chunks that fit in token_budget.
+        """
+        chunks = self.split_into_chunks(content)
+        selected = []
+        spent = 0
+        for chunk in chunks:
+            tokens = self.count_tokens(chunk)
+            if selected and spent + tokens > self.token_budget:
+                break
+            selected.append(chunk)
+            spent += tokens
+        if len(selected) < len(chunks):
+            logger.warning(f"Token budget of {self.token_budget} reached, summarizing {len(selected)} of {len(chunks)} chunks")
+        return selected
+
+    def split_into_chunks(self, content: str) -> list:
+        """
+        Splits an act into chunks of about chunk_tokens tokens. Chunks end on article ("Art."),
+        paragraph ("§"), chapter ("Rozdział") or annex ("Załącznik") boundaries where possible;
+        sections longer than a chunk are split on line breaks.
+
+        Parameters:
+            content (str): Full plain-text content of the act.
+
+        Returns:
+            list: Text chunks in document order.
+        """
+        sections = re.split(r"(?m)^(?=\s*(?:Art\.\s*\d|§\s*\d|Rozdział\s|DZIAŁ\s|Załącznik))", content)
+        pieces = []
+        for section in sections:
+            if self.count_tokens(section) <= self.chunk_tokens:
+                pieces.append(section)
+            else:
+                for line in section.splitlines():
+                    pieces.extend(self._split_by_tokens(line + "\n"))
+
+        chunks = []
+        current = []
+        current_tokens = 0
+        for piece in pieces:
+            tokens = self.count_tokens(piece)
+            if current and current_tokens + tokens > self.chunk_tokens:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+        if current:
+            chunks.append("".join(current))
+        return [chunk for chunk in chunks if chunk.strip()]
+
+    def _truncate_tokens(self, text: str, max_tokens: int) -> str:
+        """
+        Trims a text to at most max_tokens tokens.
+        """
+        encoding = get_encoding(self.model_name)
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+    def _split_by_tokens(self, text: str) -> list:
+        """
+        Splits a text without usable boundaries into pieces of at most chunk_tokens tokens.
+        """
+        encoding = get_encoding(self.model_name)
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= self.chunk_tokens:
+            return [text]
+        return [encoding.decode(tokens[start:start + self.chunk_tokens]) for start in range(0, len(tokens), self.chunk_tokens)]
+
+    def _invoke(self, messages: list, usage: dict = None):
+        """
+        Calls the LLM, waiting for the rate limiter first when one is configured.
+        The limiter is charged with an estimate (prompt tokens plus max_tokens) and corrected
+        with the usage reported by the API.
+
+        Parameters:
+            messages (list): Chat messages as (role, content) tuples.
+            usage (dict, optional): Token counters ("input", "output", "calls") updated with the reported usage.
+
+        Returns:
+            AIMessage: Model response.
+        """
+        estimated = self.count_tokens("".join(content for _, content in messages)) + self.max_tokens
+        if self.rate_limiter:
+            self.rate_limiter.acquire(estimated)
+        try:
             response = self.model.invoke(messages)
-            return(response.content)
-        except Exception as e:
-            logger.error(f"Error: {e}")
-            return (f"Error: {e}")
+        except Exception:
+            if self.rate_limiter:
+                self.rate_limiter.adjust(estimated, 0)
+            raise
+        return self._record_usage(response, estimated, usage)
+
+    async def _ainvoke(self, messages: list, usage: dict = None):
+        """
+        Asynchronous variant of _invoke. The blocking rate limiter is awaited in a worker thread.
+        """
+        estimated = self.count_tokens("".join(content for _, content in messages)) + self.max_tokens
+        if self.rate_limiter:
+            await asyncio.to_thread(self.rate_limiter.acquire, estimated)
+        try:
+            response = await self.model.ainvoke(messages)
+        except Exception:
+            if self.rate_limiter:
+                self.rate_limiter.adjust(estimated, 0)
+            raise
+        return self._record_usage(response, estimated, usage)
+
+    def _record_usage(self, response, estimated: int, usage: dict = None):
+        """
+        Corrects the rate limiter with the usage reported by the API and adds it to the usage counters.
+        """
+        reported = getattr(response, "usage_metadata", None)
+        if self.rate_limiter and reported:
+            self.rate_limiter.adjust(estimated, reported["total_tokens"])
+        if usage is not None:
+            with self._usage_lock:
+                usage["calls"] += 1
+                usage["input"] += reported["input_tokens"] if reported else estimated - self.max_tokens
+                usage["output"] += reported["output_tokens"] if reported else 0
+        return response
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Counts the tokens of a text with the encoding of the configured model.
+        """
+        return len(get_encoding(self.model_name).encode(text or "", disallowed_special=()))
+
+    def prompt_hash(self) -> str:
+        """
+        Returns a hash of the summary prompts, so stored summaries are invalidated when a prompt changes.
+        """
+        return self.prompts.hash("summary", "chunk_summary")
         
     def _get_prompt(self, prompt_name: str):
-        with open(f"prompts/{prompt_name}.md", "r") as file:
-            return file.read()
+        return self.prompts.get(prompt_name)
 
 if __name__ == "__main__":
     models = ["gpt-4.1-2025-04-14"]
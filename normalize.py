@@ -0,0 +1,62 @@
+import re
+from collections import Counter
+
+# Running page headers of the official journals, e.g. "Dziennik Ustaw – 5 – Poz. 123"
+JOURNAL_HEADER = re.compile(r"^(Dziennik Ustaw|Monitor Polski)\s*[–—-]\s*\d+\s*[–—-]\s*Poz\.\s*\d+\s*$", re.IGNORECASE)
+# Bare page numbers such as "5", "– 5 –" or "Strona 5 z 12"
+PAGE_NUMBER = re.compile(r"^([–—-]\s*)?\d+(\s*[–—-])?$|^Strona\s+\d+\s+z\s+\d+$", re.IGNORECASE)
+# Lines that legitimately repeat in acts (article, paragraph and point markers) and must never be dropped
+STRUCTURE_MARKER = re.compile(r"^(Art\.|§|\d+[a-z]?\)|[a-z]\)|Rozdział|DZIAŁ|–)")
+# Separator of pages in extracted PDF text, lets normalize_text tell page edges from body text
+PAGE_BREAK = "\f"
+# A word broken at the end of a line and continued in lower case on the next one
+HYPHENATION = re.compile(r"(\w)-\n[ \t]*([a-ząćęłńóśźż])")
+
+def normalize_text(text: str, min_repeats: int = 3, max_repeated_length: int = 100, edge_lines: int = 3) -> str:
+    """
+    Removes extraction noise that would otherwise be billed as LLM input tokens: running page
+    headers and footers, page numbers, words hyphenated across line breaks and redundant whitespace.
+    Headers, footers and page numbers are only looked for among the first and last edge_lines lines
+    of each page (pages are separated by PAGE_BREAK), so repeated lines of the body text are kept,
+    and lines starting in lower case are taken as the wrapped end of a sentence, never as a header.
+
+    Parameters:
+        text (str): Text extracted from an act.
+        min_repeats (int): Short edge lines occurring on at least this many pages are treated as headers/footers.
+        max_repeated_length (int): Longest line that can be treated as a header/footer.
+        edge_lines (int): Number of non-empty lines at the top and bottom of a page checked for headers/footers.
+
+    Returns:
+        str: Normalized text, pages joined with newlines.
+    """
+    if not text:
+        return text
+
+    pages = []
+    for page in text.split(PAGE_BREAK):
+        page = HYPHENATION.sub(r"\1\2", page)
+        lines = [re.sub(r"[ \t ]+", " ", line).strip() for line in page.splitlines()]
+        content = [index for index, line in enumerate(lines) if line]
+        # Edge lines keyed by their distance from the top or bottom of the page, since a running
+        # header or footer repeats at the same place on every page
+        edges = {index: ("top", position) for position, index in enumerate(content[:edge_lines])}
+        edges.update({index: ("bottom", position) for position, index in enumerate(reversed(content[-edge_lines:]))})
+        pages.append((lines, edges))
+
+    counts = Counter(
+        (place, lines[index]) for lines, edges in pages
+        for index, place in edges.items() if len(lines[index]) <= max_repeated_length
+    )
+
+    kept = []
+    for lines, edges in pages:
+        for index, line in enumerate(lines):
+            if index in edges and (
+                (counts[(edges[index], line)] >= min_repeats and not STRUCTURE_MARKER.match(line) and not line[0].islower())
+                or JOURNAL_HEADER.match(line) or PAGE_NUMBER.match(line)
+            ):
+                continue
+            if not line and (not kept or not kept[-1]):
+                continue  # Collapse runs of empty lines
+            kept.append(line)
+    return "\n".join(kept).strip()
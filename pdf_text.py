@@ -0,0 +1,277 @@
+import io
+import math
+import os
+import re
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pypdf import PdfReader
+from normalize import PAGE_BREAK
+from logger import Logger
+
+logger = Logger(to_file=True).get_logger()
+
+def pdf_to_text(content: bytes) -> str:
+    """
+    Extracts plain text from a PDF document held in memory.
+
+    Parameters:
+        content (bytes): PDF document.
+
+    Returns:
+        str: Extracted plain text, pages separated by PAGE_BREAK.
+
+    Raises:
+        PdfReadError: If PDF parsing fails.
+    """
+    return PAGE_BREAK.join(extract_page_range(content, 0, None))
+
+def count_pages(content: bytes) -> int:
+    """
+    Returns the number of pages of a PDF document. Runs in pool workers.
+    """
+    return len(PdfReader(io.BytesIO(content)).pages)
+
+def extract_page_range(content: bytes, start: int, end: int = None) -> list:
+    """
+    Extracts the text of pages [start, end) of a PDF document. Runs in pool workers,
+    so it only takes and returns picklable values.
+
+    Parameters:
+        content (bytes): PDF document.
+        start (int): Index of the first page.
+        end (int, optional): Index after the last page, None for the end of the document.
+
+    Returns:
+        list: Non-empty page texts in page order.
+    """
+    reader = PdfReader(io.BytesIO(content))
+    pages = []
+    for page in reader.pages[start:end]:
+        page_text = page.extract_text()
+        if page_text:
+            pages.append(page_text)
+    return pages
+
+ANNEX_PATTERN = re.compile(r"^\s*(Załącznik|ZAŁĄCZNIK|Załączniki|ZAŁĄCZNIKI)\b")
+# Announcements of a consolidated text ("obwieszczenie ... w sprawie ogłoszenia jednolitego tekstu") carry the act in an annex
+CONSOLIDATED_PATTERN = re.compile(r"jednolit\w*\s+tekst", re.IGNORECASE)
+
+def is_annex_page(page_text: str) -> bool:
+    """
+    Checks whether a page starts an annex ("Załącznik ..."), judging by its first non-empty lines.
+    Page headers such as "Dziennik Ustaw – 5 – Poz. 123" are skipped.
+    """
+    lines = [line for line in page_text.splitlines() if line.strip()][:3]
+    return any(ANNEX_PATTERN.match(line) for line in lines)
+
+def is_table_page(page_text: str, min_letter_ratio: float = 0.5) -> bool:
+    """
+    Checks whether a page is mostly numbers and punctuation (tables, forms, charts) rather than prose.
+    """
+    characters = [character for character in page_text if not character.isspace()]
+    if not characters:
+        return True
+    letters = sum(character.isalpha() for character in characters)
+    return letters / len(characters) < min_letter_ratio
+
+def extract_budgeted(content: bytes, max_chars: int, min_body_chars: int = 3000) -> str:
+    """
+    Extracts text page by page until max_chars characters were collected. Pages that are mostly
+    tables are skipped and extraction stops at the first annex, since the title, preamble and
+    first articles carry what a short summary needs. Acts whose substance is in the annex are
+    read on: acts with less than min_body_chars of text before the annex (e.g. a regulation
+    introducing a form) and announcements of a consolidated text, whose first annex is the act
+    itself. Runs in pool workers.
+
+    Parameters:
+        content (bytes): PDF document.
+        max_chars (int): Number of characters after which extraction stops.
+        min_body_chars (int): Shortest text before an annex that is summarized without the annex.
+
+    Returns:
+        str: Extracted text of at most max_chars characters, pages separated by PAGE_BREAK.
+    """
+    reader = PdfReader(io.BytesIO(content))
+    pages = []
+    collected = 0
+    annexes = 0
+    for number, page in enumerate(reader.pages):
+        page_text = page.extract_text()
+        if not page_text:
+            continue
+        if number > 0 and is_annex_page(page_text):
+            annexes += 1
+            consolidated = annexes == 1 and CONSOLIDATED_PATTERN.search("".join(pages))
+            if collected >= min_body_chars and not consolidated:
+                break
+        if is_table_page(page_text):
+            continue
+        pages.append(page_text)
+        collected += len(page_text) + 1
+        if collected >= max_chars:
+            break
+    return PAGE_BREAK.join(pages)[:max_chars]
+
+def _worker_loop(connection):
+    """
+    Main loop of a PdfExtractor worker process: runs (function, *args) tasks received over the
+    connection and sends back (True, result) or (False, exception) until the connection closes.
+    """
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        function, *args = task
+        try:
+            outcome = (True, function(*args))
+        except Exception as e:
+            outcome = (False, e)
+        try:
+            connection.send(outcome)
+        except Exception as e:
+            # The exception could not be pickled
+            connection.send((False, RuntimeError(repr(e))))
+
+class PdfExtractor():
+    def __init__(self, workers: int = None, timeout: float = 120, min_pages_per_task: int = 20):
+        """
+        Extracts PDF text in worker processes, so CPU-bound pypdf parsing uses every core.
+        Documents submitted from several threads are extracted in parallel, and documents longer than
+        min_pages_per_task are split into page ranges spread across workers and reassembled in order.
+        Every worker is a separate process with its own connection: a task's timeout starts when a worker
+        picks it up, and a task that overruns it terminates only its own worker, which is replaced,
+        so other documents being extracted at the same time are not affected.
+
+        Parameters:
+            workers (int, optional): Number of worker processes, defaults to the number of CPUs.
+                Use 1 to extract in the calling process.
+            timeout (float): Seconds a single extraction task (a document or one of its page ranges)
+                may run before it is abandoned.
+            min_pages_per_task (int): Smallest page range handed to one worker.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.min_pages_per_task = min_pages_per_task
+        self._context = multiprocessing.get_context()
+        self._lock = threading.Lock()
+        self._processes = set()
+        # Idle workers as (process, connection) pairs; None is a free slot whose process is started on demand
+        self._idle = queue.Queue()
+        for _ in range(self.workers):
+            self._idle.put(None)
+        self._dispatcher = None
+
+    def extract(self, content: bytes, max_chars: int = None) -> str:
+        """
+        Extracts plain text from a PDF document.
+
+        Parameters:
+            content (bytes): PDF document.
+            max_chars (int, optional): Extract lazily, page by page, and stop after this many characters
+                (see extract_budgeted). The budgeted extraction runs in a single worker.
+
+        Returns:
+            str: Extracted plain text, pages separated by PAGE_BREAK, or None if extraction timed out
+            or the worker crashed.
+
+        Raises:
+            PdfReadError: If PDF parsing fails.
+        """
+        if self.workers <= 1:
+            return extract_budgeted(content, max_chars) if max_chars else pdf_to_text(content)
+
+        try:
+            if max_chars:
+                return self._run((extract_budgeted, content, max_chars))
+            # Pages are counted in a worker too, so a malformed document cannot stall or crash the calling process
+            page_count = self._run((count_pages, content))
+            pages_per_task = max(self.min_pages_per_task, math.ceil(page_count / self.workers))
+            tasks = [(extract_page_range, content, start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+            if len(tasks) == 1:
+                results = [self._run(tasks[0])]
+            else:
+                results = list(self._get_dispatcher().map(self._run, tasks))
+        except TimeoutError:
+            logger.error(f"PDF extraction timed out after {self.timeout}s")
+            return None
+        except (EOFError, OSError) as e:
+            logger.error(f"PDF worker crashed: {e!r}")
+            return None
+
+        return PAGE_BREAK.join(page for pages in results for page in pages)
+
+    def shutdown(self):
+        """
+        Stops the worker processes.
+        """
+        with self._lock:
+            processes, self._processes = list(self._processes), set()
+            dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher:
+            dispatcher.shutdown(wait=False, cancel_futures=True)
+        for process, connection in processes:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+            connection.close()
+
+    def _run(self, task: tuple):
+        """
+        Runs one task in an idle worker, waiting at most timeout seconds from the moment the worker
+        received it. A worker that overruns or dies is terminated and its slot freed for a new process.
+
+        Raises:
+            TimeoutError: If the task did not finish in time.
+            EOFError, OSError: If the worker process died.
+        """
+        worker = self._idle.get()
+        try:
+            if worker is None:
+                worker = self._start_worker()
+            process, connection = worker
+            connection.send(task)
+            if not connection.poll(self.timeout):
+                raise TimeoutError(f"PDF task did not finish within {self.timeout}s")
+            succeeded, value = connection.recv()
+        except BaseException:
+            if worker is not None:
+                self._stop_worker(worker)
+            self._idle.put(None)
+            raise
+        self._idle.put(worker)
+        if not succeeded:
+            raise value
+        return value
+
+    def _start_worker(self) -> tuple:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(target=_worker_loop, args=(child,), daemon=True)
+        process.start()
+        child.close()
+        with self._lock:
+            self._processes.add((process, parent))
+        return process, parent
+
+    def _stop_worker(self, worker: tuple):
+        process, connection = worker
+        with self._lock:
+            self._processes.discard(worker)
+        process.terminate()
+        process.join(1)
+        connection.close()
+
+    def _get_dispatcher(self) -> ThreadPoolExecutor:
+        # Threads waiting on the page ranges of split documents; they only block, the work runs in the workers
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf")
+            return self._dispatcher
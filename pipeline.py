@@ -0,0 +1,274 @@
+import asyncio
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from document_cache import DocumentCache
+from http_client import HttpClient
+from model import SUMMARY_UNAVAILABLE, LegalActSummarizer
+from scrapper import SEARCH_URL, LawScrapper
+from logger import Logger
+
+logger = Logger(to_file=True).get_logger()
+
+# HTTP/2 needs the optional h2 package (httpx[http2]), without it the pipeline falls back to HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+class AsyncPipeline():
+    def __init__(
+        self,
+        scrapper: LawScrapper,
+        summarizer: LegalActSummarizer,
+        download_workers: int = 8,
+        extract_workers: int = 4,
+        llm_workers: int = 4,
+        queue_size: int = 16,
+        http2: bool = True,
+        timeout: float = 60,
+        http_client: HttpClient = None,
+        act_timeout: float = None,
+    ):
+        """
+        Asyncio pipeline that processes acts in stages connected by bounded queues:
+        search pages -> document download -> text extraction -> summarization.
+        Every stage is a fixed pool of workers, so downloads, extraction and LLM calls overlap,
+        while the bounded queues make a fast stage wait for a slow one (backpressure) and cap
+        the number of documents held in memory.
+
+        Parameters:
+            scrapper (LawScrapper): Scrapper whose search parameters and act formatting are used.
+            summarizer (LegalActSummarizer): Summarizer providing the document cache, extraction and ainvoke summaries.
+            download_workers (int): Concurrent document downloads, also the size of the HTTP connection pool.
+            extract_workers (int): Threads extracting text (PDFs are handed on to the summarizer's process pool).
+            llm_workers (int): Concurrent summarizations.
+            queue_size (int): Capacity of each queue between stages.
+            http2 (bool): Use HTTP/2 when the h2 package is installed.
+            timeout (float): Timeout of a single HTTP request in seconds.
+            http_client (HttpClient, optional): Client whose rate limit, adaptive concurrency and retries
+                apply to the pipeline's requests, by default the scrapper's, so the pipeline and the
+                synchronous workflow share one limit on Sejm API traffic.
+            act_timeout (float, optional): Seconds the summarization of one act may take before the act
+                is left pending, as in the synchronous workflow. None means no limit.
+        """
+        self.scrapper = scrapper
+        self.summarizer = summarizer
+        self.download_workers = download_workers
+        self.extract_workers = extract_workers
+        self.llm_workers = llm_workers
+        self.queue_size = queue_size
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.timeout = timeout
+        self.http = http_client or scrapper.http
+        self.act_timeout = act_timeout
+
+    def run(self, acts: list = None, date_from=None, date_to=None, keywords: list = None, deadline: float = None) -> list:
+        """
+        Runs the pipeline to completion and returns the processed acts.
+
+        Parameters:
+            acts (list, optional): Formatted acts to summarize. When omitted, acts are searched for
+                with date_from, date_to and keywords in the first stage of the pipeline.
+            date_from (datetime, optional): Starting date of effectiveness.
+            date_to (datetime, optional): Ending date of effectiveness.
+            keywords (list, optional): Keywords to search for, one query per keyword.
+            deadline (float, optional): Seconds after which unfinished acts are left pending.
+
+        Returns:
+            list: Acts with "summary", "tokens" and "pending", in input (or discovery) order.
+
+        Raises:
+            httpx.HTTPError: If a search request still fails after retries, so an incomplete list of acts
+                is never reported as complete.
+        """
+        return asyncio.run(self.arun(acts, date_from, date_to, keywords, deadline))
+
+    async def arun(self, acts: list = None, date_from=None, date_to=None, keywords: list = None, deadline: float = None) -> list:
+        """
+        Asynchronous variant of run.
+        """
+        discovered = list(acts or [])
+        results = {}
+        download_queue = asyncio.Queue(self.queue_size)
+        extract_queue = asyncio.Queue(self.queue_size)
+        summarize_queue = asyncio.Queue(self.queue_size)
+
+        limits = httpx.Limits(max_connections=self.download_workers, max_keepalive_connections=self.download_workers)
+        async with httpx.AsyncClient(http2=self.http2, limits=limits, timeout=self.timeout, follow_redirects=True) as client:
+            # Not a context manager: after a deadline a stuck extraction must not block shutdown
+            executor = ThreadPoolExecutor(max_workers=self.extract_workers)
+            try:
+                async def produce():
+                    if acts is not None:
+                        for index, act in enumerate(acts):
+                            await download_queue.put((index, act))
+                    else:
+                        await self._search(client, date_from, date_to, keywords, discovered, download_queue)
+
+                async def download(item):
+                    index, act = item
+                    for url in self.summarizer.act_sources(act):
+                        text = await asyncio.to_thread(self.summarizer.get_fresh_text, url)
+                        if text:
+                            await summarize_queue.put((index, act, text))
+                            return
+                        content = await self._download(client, url)
+                        if content is not None:
+                            await extract_queue.put((index, act, url, content))
+                            return
+                    await summarize_queue.put((index, act, None))
+
+                async def extract(item):
+                    index, act, url, content = item
+                    loop = asyncio.get_running_loop()
+                    text = await loop.run_in_executor(executor, self.summarizer.extract_text, url, content)
+                    if not text:
+                        # Fall back to the next source of the act, e.g. the PDF when the HTML text is empty
+                        sources = self.summarizer.act_sources(act)
+                        for fallback in sources[sources.index(url) + 1:]:
+                            logger.warning(f"No text extracted from {url}, trying {fallback}")
+                            text = await loop.run_in_executor(executor, self.summarizer.get_act_content, fallback)
+                            if text:
+                                break
+                    await summarize_queue.put((index, act, text))
+
+                async def summarize(item):
+                    index, act, text = item
+                    if not text:
+                        logger.error(f"No text could be extracted for {act.get('eli')}")
+                        results[index] = {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
+                        return
+                    try:
+                        results[index] = await asyncio.wait_for(self.summarizer.asummarize(text, eli=act.get("eli")), self.act_timeout)
+                    except asyncio.TimeoutError:
+                        logger.warning(f"Summary of {act.get('eli')} is pending: no result within {self.act_timeout:.0f}s")
+                        results[index] = {"summary": None, "tokens": None, "pending": True}
+
+                async def produce_and_stop():
+                    try:
+                        await produce()
+                    except Exception as e:
+                        logger.error(f"Error while searching acts: {e}")
+                        raise
+                    for _ in range(self.download_workers):
+                        await download_queue.put(None)
+
+                pipeline = asyncio.gather(
+                    produce_and_stop(),
+                    self._workers(download_queue, self.download_workers, download, results, extract_queue, self.extract_workers),
+                    self._workers(extract_queue, self.extract_workers, extract, results, summarize_queue, self.llm_workers),
+                    self._workers(summarize_queue, self.llm_workers, summarize, results),
+                )
+                try:
+                    await asyncio.wait_for(pipeline, timeout=deadline)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Pipeline deadline of {deadline:.0f}s reached, {len(discovered) - len(results)} acts are pending")
+                except BaseException:
+                    pipeline.cancel()
+                    raise
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        processed = []
+        for index, act in enumerate(discovered):
+            result = results.get(index) or {"summary": None, "tokens": None, "pending": True}
+            processed.append({**act, "summary": result.get("summary"), "tokens": result.get("tokens"), "pending": result.get("pending", False)})
+        return processed
+
+    async def _workers(self, queue: asyncio.Queue, count: int, handle, results: dict, next_queue: asyncio.Queue = None, next_count: int = 0):
+        """
+        Runs count workers handling items from queue until each of them receives a stop marker (None),
+        then sends one stop marker to every worker of the next stage. An act whose handling fails
+        gets the same SUMMARY_UNAVAILABLE result as in the synchronous workflow.
+        """
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                try:
+                    await handle(item)
+                except Exception as e:
+                    logger.error(f"Error while processing act {item[1].get('eli')}: {e}")
+                    results[item[0]] = {"summary": SUMMARY_UNAVAILABLE, "tokens": None}
+
+        await asyncio.gather(*[worker() for _ in range(count)])
+        for _ in range(next_count):
+            await next_queue.put(None)
+
+    async def _search(self, client: httpx.AsyncClient, date_from, date_to, keywords: list, discovered: list, queue: asyncio.Queue):
+        """
+        Search stage: pages through one query per keyword concurrently and queues every new act
+        (de-duplicated by ELI) as soon as its page arrives. A page that cannot be fetched raises.
+        """
+        seen_elis = set()
+        async def search(keyword_filter: list):
+            offset = 0
+            while True:
+                params = self.scrapper.search_params(None, keyword_filter, date_from, date_to, offset)
+                response = await self.http.arequest(client, "GET", SEARCH_URL, params=params, headers={"Accept": "application/json"})
+                if response.status_code != 200:
+                    logger.error(f"Error request: {response.status_code}")
+                    response.raise_for_status()
+                payload = response.json()
+                items = payload.get("items", [])
+                total = payload.get("totalCount", offset + len(items))
+                for raw_act in items:
+                    eli = raw_act.get("ELI")
+                    if eli and eli not in seen_elis:
+                        seen_elis.add(eli)
+                        act = self.scrapper.format_act(raw_act)
+                        discovered.append(act)
+                        await queue.put((len(discovered) - 1, act))
+                offset += len(items)
+                if not items or offset >= total:
+                    return
+
+        await asyncio.gather(*[search([keyword] if keyword else None) for keyword in (keywords or [None])])
+        logger.info(f"Found {len(discovered)} acts")
+
+    async def _download(self, client: httpx.AsyncClient, url: str) -> bytes:
+        """
+        Downloads a document over the shared HTTP/2 connection pool, subject to the HTTP client's rate limit,
+        concurrency limit and retries, using the summarizer's document cache (conditional requests) and
+        refusing documents larger than its size limit.
+
+        Returns:
+            bytes: Document content, or None if the download failed.
+        """
+        cache = self.summarizer.document_cache
+        key = DocumentCache.key_from_url(url)
+        if cache and cache.is_fresh(key):
+            content = cache.read(key)
+            if content is not None:
+                return content
+
+        limit = self.summarizer.max_document_bytes
+        headers = cache.conditional_headers(key) if cache else {}
+        try:
+            response = await self.http.arequest(client, "GET", url, stream=True, headers=headers)
+            try:
+                if cache and response.status_code == 304:
+                    logger.info(f"{key} not modified, using cached copy")
+                    cache.touch(key)
+                    return cache.read(key)
+                response.raise_for_status()
+                length = response.headers.get("Content-Length")
+                if length and length.isdigit() and int(length) > limit:
+                    logger.error(f"Document {url} is {int(length)} bytes, limit is {limit}")
+                    return None
+                buffer = bytearray()
+                async for chunk in response.aiter_bytes(64 * 1024):
+                    buffer.extend(chunk)
+                    if len(buffer) > limit:
+                        logger.error(f"Document {url} exceeds {limit} bytes, download aborted")
+                        return None
+                etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+            finally:
+                await response.aclose()
+        except httpx.HTTPError as e:
+            logger.error(f"Error: {e}")
+            return None
+
+        content = bytes(buffer)
+        if cache:
+            await asyncio.to_thread(cache.store, key, url, content, etag, last_modified)
+        return content
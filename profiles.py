@@ -0,0 +1,100 @@
+import json
+import os
+from relevance import load_vocabulary
+
+def load_profiles(path: str = None, default_keywords: list = None) -> list:
+    """
+    Reads subscriber profiles from a JSON file holding a list of objects with "name", "keywords",
+    "recipients" and optionally "vocabulary": relevance term weights given inline or as the path
+    of a JSON file (relative to the profiles file). A profile without keywords receives all acts,
+    a profile without recipients is sent to SMTP_TO and a profile without vocabulary is scored with
+    the run-wide one. Without a file, a single profile with the default keywords is returned.
+
+    Parameters:
+        path (str, optional): Path to the JSON file.
+        default_keywords (list, optional): Keywords of the default profile.
+
+    Returns:
+        list: Profiles as dicts with "name", "keywords", "recipients" and "vocabulary".
+
+    Raises:
+        ValueError: If the file does not contain a list of profiles with unique names.
+    """
+    if not path:
+        return [{"name": "default", "keywords": list(default_keywords or []), "recipients": None, "vocabulary": None}]
+
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if not isinstance(data, list) or not data:
+        raise ValueError(f"{path} must contain a non-empty list of profiles")
+
+    profiles = []
+    for position, entry in enumerate(data, 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Profile {position} in {path} must be an object")
+        recipients = entry.get("recipients")
+        vocabulary = entry.get("vocabulary")
+        if isinstance(vocabulary, str):
+            vocabulary = load_vocabulary(os.path.join(os.path.dirname(path), vocabulary))
+        elif vocabulary is not None and not isinstance(vocabulary, dict):
+            raise ValueError(f"Vocabulary of profile {position} in {path} must be an object or a file path")
+        profiles.append({
+            "name": entry.get("name") or f"profile-{position}",
+            "keywords": list(entry.get("keywords") or []),
+            "recipients": [recipients] if isinstance(recipients, str) else recipients or None,
+            "vocabulary": {term: float(weight) for term, weight in vocabulary.items()} if vocabulary else None,
+        })
+    names = [profile["name"] for profile in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Profile names in {path} must be unique")
+    return profiles
+
+def union_keywords(profiles: list) -> list:
+    """
+    Returns the keywords of all profiles without duplicates, in order of first appearance,
+    so every act is fetched once for all profiles.
+
+    Returns:
+        list: Keywords, or None when a profile takes all acts (no keyword filter).
+    """
+    keywords = {}
+    for profile in profiles:
+        if not profile["keywords"]:
+            return None
+        for keyword in profile["keywords"]:
+            keywords.setdefault(keyword.casefold(), keyword)
+    return list(keywords.values())
+
+def matches(act: dict, profile: dict) -> bool:
+    """
+    Checks whether an act is tagged with any of the profile's keywords (always true for a profile without keywords).
+    """
+    if not profile["keywords"]:
+        return True
+    # Act keywords are joined with ", " and some keyword names contain commas, so match whole items in the joined string
+    names = f", {(act.get('keywords') or '').casefold()}, "
+    return any(f", {keyword.casefold()}, " in names for keyword in profile["keywords"])
+
+def select_acts(acts: list, profile: dict, threshold: float = None) -> list:
+    """
+    Selects the acts of a profile's digest: the acts tagged with any of its keywords. Acts scored
+    per profile (see "profile_relevance") are marked relevant by the profile's own score, so an act
+    summarized for another profile is listed by title only when it is below the threshold for this one.
+
+    Parameters:
+        acts (list): Processed acts of the run, shared by all profiles.
+        profile (dict): Profile.
+        threshold (float, optional): Relevance threshold, None when relevance is not scored.
+
+    Returns:
+        list: Matching acts, in the order of the run.
+    """
+    selected = []
+    for act in acts:
+        if not matches(act, profile):
+            continue
+        score = (act.get("profile_relevance") or {}).get(profile["name"])
+        if threshold and score is not None and act.get("relevant") is not False:
+            act = {**act, "relevant": score >= threshold}
+        selected.append(act)
+    return selected
@@ -0,0 +1,57 @@
+import os
+import threading
+from summary_store import content_hash
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+
+class PromptRegistry():
+    def __init__(self, directory: str = PROMPTS_DIR):
+        """
+        Loads prompt templates ("<name>.md") once and serves them from memory. A template is
+        re-read only when the modification time of its file changes, so prompts can still be
+        edited between runs without restarting a long-lived process.
+
+        Parameters:
+            directory (str): Directory with the prompt files, by default "prompts" next to this module,
+                independent of the current working directory.
+        """
+        self.directory = directory
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> str:
+        """
+        Returns the text of a prompt template.
+
+        Parameters:
+            name (str): Template name without the ".md" extension.
+
+        Returns:
+            str: Template text.
+
+        Raises:
+            FileNotFoundError: If the template does not exist.
+        """
+        return self._load(name)[1]
+
+    def hash(self, *names: str) -> str:
+        """
+        Returns a hash of one or more templates, used in cache keys so cached results
+        are invalidated when a prompt changes.
+        """
+        return content_hash("".join(self._load(name)[1] for name in names))
+
+    def _load(self, name: str) -> tuple:
+        path = os.path.join(self.directory, f"{name}.md")
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._templates.get(name)
+            if cached and cached[0] == mtime:
+                return cached
+            with open(path, "r", encoding="utf-8") as file:
+                text = file.read()
+            self._templates[name] = (mtime, text)
+            return self._templates[name]
+
+# Templates shared by every summarizer in the process
+prompt_registry = PromptRegistry()
@@ -0,0 +1,76 @@
+import threading
+import time
+from logger import Logger
+
+logger = Logger(to_file=True).get_logger()
+
+class TokenRateLimiter():
+    def __init__(self, tokens_per_minute: int, capacity: int = None):
+        """
+        Thread-safe token bucket limiting LLM usage to a number of tokens per minute, so concurrent
+        requests stay under the provider's TPM quota instead of failing with HTTP 429.
+
+        Parameters:
+            tokens_per_minute (int): Tokens that may be spent per minute. The bucket starts full.
+            capacity (int, optional): Largest burst, defaults to one minute's worth of tokens.
+        """
+        self.capacity = capacity or tokens_per_minute
+        self.rate = tokens_per_minute / 60
+        self._available = float(self.capacity)
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens: int):
+        """
+        Blocks until the given number of tokens can be spent. Requests larger than the whole
+        bucket wait for a full bucket, so they are never blocked forever.
+
+        Parameters:
+            tokens (int): Estimated tokens of the request (prompt plus completion).
+        """
+        tokens = min(tokens, self.capacity)
+        with self._condition:
+            while True:
+                self._refill()
+                if self._available >= tokens:
+                    self._available -= tokens
+                    return
+                wait = (tokens - self._available) / self.rate
+                logger.info(f"Rate limit: waiting {wait:.1f}s for {tokens} tokens")
+                self._condition.wait(wait)
+
+    def try_acquire(self, tokens: int) -> float:
+        """
+        Non-blocking variant of acquire for asyncio callers: spends the tokens if they are available.
+
+        Parameters:
+            tokens (int): Tokens to spend.
+
+        Returns:
+            float: 0 if the tokens were spent, otherwise the seconds to wait before trying again.
+        """
+        tokens = min(tokens, self.capacity)
+        with self._condition:
+            self._refill()
+            if self._available >= tokens:
+                self._available -= tokens
+                return 0.0
+            return (tokens - self._available) / self.rate
+
+    def adjust(self, estimated: int, actual: int):
+        """
+        Corrects the bucket once the real token usage of a request is known.
+
+        Parameters:
+            estimated (int): Tokens acquired before the request.
+            actual (int): Tokens reported by the provider.
+        """
+        with self._condition:
+            self._refill()
+            self._available = min(self.capacity, self._available + estimated - actual)
+            self._condition.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
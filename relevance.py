@@ -0,0 +1,178 @@
+import json
+import re
+from collections import Counter
+
+# Vocabulary of the fire-safety/OHS team: terms (matched by their stem) and their weights
+DEFAULT_VOCABULARY = {
+    "bezpieczeństwo": 2.0,
+    "higiena": 2.0,
+    "bhp": 3.0,
+    "pracownik": 1.0,
+    "pracodawca": 1.5,
+    "przeciwpożarowy": 3.0,
+    "pożar": 3.0,
+    "pożarowy": 3.0,
+    "straż": 2.0,
+    "ratowniczy": 1.5,
+    "gaśniczy": 2.5,
+    "ewakuacja": 2.5,
+    "wypadek": 2.5,
+    "zawodowy": 1.0,
+    "choroba": 1.0,
+    "szkodliwy": 2.0,
+    "niebezpieczny": 1.5,
+    "uciążliwy": 1.5,
+    "hałas": 2.0,
+    "wibracje": 2.0,
+    "ochrona": 1.0,
+    "odzież": 1.5,
+    "sprzęt": 1.0,
+    "dozór": 2.0,
+    "techniczny": 1.0,
+    "inspekcja": 1.5,
+    "szkolenie": 1.0,
+    "narażenie": 2.0,
+    "wybuch": 2.5,
+    "substancja": 1.0,
+    "chemiczny": 1.0,
+}
+
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+")
+# Inflectional endings of Polish nouns and adjectives, longest first
+ENDINGS = sorted((
+    "ach", "ami", "om", "ów", "ią", "ie", "ia", "iu", "ii", "em", "ym", "im", "ej", "ego", "emu",
+    "ych", "ich", "ymi", "imi", "a", "ą", "e", "ę", "i", "o", "u", "y",
+), key=len, reverse=True)
+# Vowel alternations inside a stem ("pożarów"/"pożar", "dozór"/"dozoru", "szkoleń"/"szkolenie")
+ALTERNATIONS = str.maketrans({"ó": "o", "ń": "n"})
+
+def stem(word: str, min_length: int = 3) -> str:
+    """
+    Reduces a lower-cased Polish word to a stem shared by its inflected forms ("pożar", "pożarem",
+    "pożarów" -> "pożar"; "wypadek", "wypadki" -> "wypadk") by removing the longest inflectional
+    ending that leaves at least min_length letters. Derived words keep a longer stem ("pożarnej" -> "pożarn"),
+    so the scorer matches vocabulary stems as word prefixes.
+
+    Parameters:
+        word (str): Lower-cased word.
+        min_length (int): Shortest stem that is left after removing an ending.
+
+    Returns:
+        str: Stem of the word.
+    """
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= min_length:
+            word = word[:-len(ending)]
+            break
+    else:
+        # Mobile e of nouns ending in -ek ("wypadek", "wypadku")
+        if word.endswith("ek") and len(word) > min_length + 1:
+            word = word[:-2] + "k"
+    return word.translate(ALTERNATIONS)
+
+def tokenize(text: str) -> list:
+    """
+    Splits text into lower-cased word stems (see stem).
+
+    Parameters:
+        text (str): Text to tokenize.
+
+    Returns:
+        list: Word stems in text order.
+    """
+    return [stem(word) for word in TOKEN_PATTERN.findall((text or "").lower())]
+
+class RelevanceScorer():
+    def __init__(self, vocabulary: dict = None, k1: float = 1.5, b: float = 0.75, min_stem_length: int = 4):
+        """
+        Scores acts against a profile vocabulary with BM25, so acts matched only by a broad Sejm keyword
+        can be listed without being downloaded in full and summarized. The vocabulary weights take the
+        place of the corpus IDF, so a score does not depend on how many acts are scored together and one
+        threshold works for a weekly run and for a backfill.
+
+        A word counts for a vocabulary term when its stem starts with the term's stem, so inflected and
+        derived forms match ("Straży Pożarnej" for "straż" and "pożar") while words that only share
+        a few letters do not ("przeciętnego" for "przeciwpożarowy").
+
+        Parameters:
+            vocabulary (dict, optional): Term weights of the profile, defaults to DEFAULT_VOCABULARY.
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 document length normalization.
+            min_stem_length (int): Shortest term stem matched as a prefix; shorter terms ("bhp")
+                match whole words only.
+        """
+        self.k1 = k1
+        self.b = b
+        self.min_stem_length = min_stem_length
+        self.weights = {}
+        for term, weight in (vocabulary or DEFAULT_VOCABULARY).items():
+            for term_stem in tokenize(term):
+                self.weights[term_stem] = max(weight, self.weights.get(term_stem, 0))
+        self._lengths = sorted({len(term_stem) for term_stem in self.weights}, reverse=True)
+        self._terms = {}
+
+    def score(self, document: str) -> float:
+        """
+        Scores a single document.
+        """
+        return self.score_all([document])[0]
+
+    def score_all(self, documents: list) -> list:
+        """
+        Scores documents in one pass. Only vocabulary stems are counted and the term of every distinct
+        word is looked up once, so thousands of acts are scored in well under a second.
+
+        Parameters:
+            documents (list): Texts to score, e.g. the title followed by the first pages.
+
+        Returns:
+            list: BM25 scores in document order.
+        """
+        tokenized = [tokenize(document) for document in documents]
+        lengths = [len(tokens) for tokens in tokenized]
+        average_length = (sum(lengths) / len(lengths)) if lengths and sum(lengths) else 1
+
+        scores = []
+        for tokens, length in zip(tokenized, lengths):
+            counts = Counter(term for term in map(self._term, tokens) if term)
+            norm = self.k1 * (1 - self.b + self.b * length / average_length)
+            scores.append(sum(
+                self.weights[term] * count * (self.k1 + 1) / (count + norm)
+                for term, count in counts.items()
+            ))
+        return scores
+
+    def _term(self, token: str) -> str:
+        # Longest vocabulary stem the token starts with, None for words outside the vocabulary
+        if token not in self._terms:
+            term = token if token in self.weights else None
+            for length in self._lengths:
+                if term or length < self.min_stem_length:
+                    break
+                if length < len(token) and token[:length] in self.weights:
+                    term = token[:length]
+            self._terms[token] = term
+        return self._terms[token]
+
+def act_document(act: dict, text: str = None, max_chars: int = 4000) -> str:
+    """
+    Builds the text an act is scored on: its title followed by the beginning of its text. The Sejm
+    keywords are left out because they are what selected the act, so they would lift every act
+    of a broad keyword over the threshold.
+
+    Parameters:
+        act (dict): Formatted act.
+        text (str, optional): Extracted text of the act.
+        max_chars (int): Number of leading characters of the text that are scored.
+
+    Returns:
+        str: Document to score.
+    """
+    return "\n".join(part for part in (act.get("title"), (text or "")[:max_chars]) if part)
+
+def load_vocabulary(path: str) -> dict:
+    """
+    Reads a profile vocabulary from a JSON file mapping terms to weights.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return {term: float(weight) for term, weight in json.load(file).items()}
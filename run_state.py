@@ -0,0 +1,155 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import String, Text, DateTime, select, delete
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from database import Base, get_engine
+from logger import Logger
+
+logger = Logger(to_file=True).get_logger()
+
+class StateValue(Base):
+    """
+    A named value persisted between runs, e.g. the high-water mark.
+    """
+    __tablename__ = "run_state"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    value: Mapped[str] = mapped_column(String)
+
+class SeenAct(Base):
+    """
+    An act that was already sent in a digest.
+    """
+    __tablename__ = "seen_acts"
+
+    eli: Mapped[str] = mapped_column(String, primary_key=True)
+    seen_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+class PendingAct(Base):
+    """
+    An act listed as "summary pending" in a digest, carried over to the next run.
+    """
+    __tablename__ = "pending_acts"
+
+    eli: Mapped[str] = mapped_column(String, primary_key=True)
+    act: Mapped[str] = mapped_column(Text)
+    added_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+class RunState():
+    HIGH_WATER_MARK = "high_water_mark"
+
+    def __init__(self, url: str = "sqlite:///cache/lawscrapper.db", overlap_days: int = 3, retention_days: int = 365):
+        """
+        Initializes the persistent state used by incremental runs: the date up to which acts
+        were already processed (high-water mark) and the set of ELIs already sent in a digest.
+
+        Parameters:
+            url (str): SQLAlchemy database URL.
+            overlap_days (int): Days re-scanned before the high-water mark to catch late publications.
+            retention_days (int): Seen ELIs older than this are forgotten.
+        """
+        self.engine = get_engine(url)
+        self.overlap_days = overlap_days
+        self.retention_days = retention_days
+
+    def get_value(self, name: str) -> str:
+        """
+        Returns a named value persisted between runs, or None if it is not set.
+        """
+        with Session(self.engine) as session:
+            record = session.get(StateValue, name)
+            return record.value if record else None
+
+    def set_value(self, name: str, value: str):
+        """
+        Persists a named value between runs. Setting None removes it.
+        """
+        with Session(self.engine) as session:
+            if value is None:
+                session.execute(delete(StateValue).where(StateValue.name == name))
+            else:
+                session.merge(StateValue(name=name, value=value))
+            session.commit()
+
+    def get_high_water_mark(self) -> datetime:
+        """
+        Returns the end of the window scanned by the last successful run, or None before the first one.
+        """
+        value = self.get_value(self.HIGH_WATER_MARK)
+        return datetime.fromisoformat(value) if value else None
+
+    def get_window_start(self, default: datetime) -> datetime:
+        """
+        Returns the start of the next incremental window: the high-water mark minus the overlap.
+
+        Parameters:
+            default (datetime): Window start used when no run has completed yet.
+
+        Returns:
+            datetime: Start of the window to fetch.
+        """
+        high_water_mark = self.get_high_water_mark()
+        if high_water_mark is None:
+            return default
+        return high_water_mark - timedelta(days=self.overlap_days)
+
+    def filter_new(self, acts: list) -> list:
+        """
+        Drops acts whose ELI was already sent in a previous digest.
+
+        Parameters:
+            acts (list): Formatted acts.
+
+        Returns:
+            list: Acts not seen before, in the original order.
+        """
+        elis = [act["eli"] for act in acts if act.get("eli")]
+        with Session(self.engine) as session:
+            seen = set(session.scalars(select(SeenAct.eli).where(SeenAct.eli.in_(elis))).all()) if elis else set()
+
+        new_acts = [act for act in acts if act.get("eli") not in seen]
+        logger.info(f"{len(acts) - len(new_acts)} of {len(acts)} acts were already processed")
+        return new_acts
+
+    def mark_processed(self, acts: list, high_water_mark: datetime):
+        """
+        Records the acts as sent and advances the high-water mark. Call only after the digest was delivered.
+
+        Parameters:
+            acts (list): Formatted acts included in the digest.
+            high_water_mark (datetime): End of the window that was scanned.
+        """
+        now = datetime.now()
+        with Session(self.engine) as session:
+            for act in acts:
+                if act.get("eli"):
+                    session.merge(SeenAct(eli=act["eli"], seen_at=now))
+            session.merge(StateValue(name=self.HIGH_WATER_MARK, value=high_water_mark.isoformat()))
+            session.execute(delete(SeenAct).where(SeenAct.seen_at < now - timedelta(days=self.retention_days)))
+            session.commit()
+        logger.info(f"Marked {len(acts)} acts as processed, high-water mark {high_water_mark:%Y-%m-%d}")
+
+    def get_pending(self) -> list:
+        """
+        Returns the acts whose summary was still pending when the last digest was sent, oldest first.
+        """
+        with Session(self.engine) as session:
+            return [json.loads(record.act) for record in session.scalars(select(PendingAct).order_by(PendingAct.added_at))]
+
+    def set_pending(self, acts: list):
+        """
+        Replaces the carried-over acts with the acts left pending or unsummarized by this run.
+
+        Parameters:
+            acts (list): Formatted acts whose summary did not finish in time or failed.
+        """
+        with Session(self.engine) as session:
+            added = {record.eli: record.added_at for record in session.scalars(select(PendingAct))}
+            session.execute(delete(PendingAct))
+            for act in acts:
+                if act.get("eli"):
+                    carried = {key: value for key, value in act.items() if key not in ("summary", "tokens", "pending")}
+                    session.merge(PendingAct(eli=act["eli"], act=json.dumps(carried, ensure_ascii=False), added_at=added.get(act["eli"], datetime.now())))
+            session.commit()
+        if acts:
+            logger.info(f"{len(acts)} acts with pending or failed summaries carried over to the next run")
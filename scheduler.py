@@ -0,0 +1,98 @@
+import threading
+import time
+
+def estimate_cost(act: dict) -> float:
+    """
+    Estimates the relative cost of summarizing an act from what is known before downloading it.
+    HTML text is cheap to fetch and parse, a PDF-only act needs a larger download and pypdf extraction.
+
+    Parameters:
+        act (dict): Formatted act.
+
+    Returns:
+        float: Relative cost, 1.0 for an act with HTML text.
+    """
+    if act.get("html"):
+        return 1.0
+    if act.get("pdf"):
+        return 3.0
+    return 0.5
+
+def prioritize(tasks: list) -> list:
+    """
+    Orders (index, act) pairs so the most relevant and cheapest acts are processed first,
+    keeping the digest order among acts of equal priority.
+
+    Parameters:
+        tasks (list): (index, act) pairs.
+
+    Returns:
+        list: The same pairs, highest priority first.
+    """
+    return sorted(tasks, key=lambda task: (-(task[1].get("relevance") or 0), estimate_cost(task[1]), task[0]))
+
+def run_with_timeout(function, timeout: float, *args):
+    """
+    Runs a function in a daemon thread and waits at most timeout seconds for it. A call that
+    times out cannot be interrupted, it is abandoned and does not keep the process alive.
+
+    Parameters:
+        function (callable): Function to call.
+        timeout (float): Seconds to wait, None waits without a limit.
+        *args: Arguments of the function.
+
+    Returns:
+        Any: Return value of the function.
+
+    Raises:
+        TimeoutError: If the function did not finish in time.
+    """
+    outcome = {}
+    def target():
+        try:
+            outcome["result"] = function(*args)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"{getattr(function, '__name__', 'call')} did not finish within {timeout:.0f}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+class RunBudget():
+    def __init__(self, seconds: float = None, act_timeout: float = None):
+        """
+        Wall-clock budget of a run, so per-act work stops in time for the digest to be sent
+        before the job is killed.
+
+        Parameters:
+            seconds (float, optional): Seconds available for per-act work from now, None for no limit.
+            act_timeout (float, optional): Seconds a single act may take, None for no limit.
+        """
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.act_timeout = act_timeout
+
+    def remaining(self) -> float:
+        """
+        Returns the seconds left in the budget, None when the budget is unlimited.
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        """
+        Checks whether the budget is spent.
+        """
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def timeout_for_act(self) -> float:
+        """
+        Returns how long the next act may take: the per-act timeout capped by the remaining budget.
+        """
+        limits = [limit for limit in (self.act_timeout, self.remaining()) if limit is not None]
+        return min(limits) if limits else None
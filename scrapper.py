@@ -1,24 +1,58 @@
 import requests
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
+from http_client import HttpClient
 from logger import Logger
 
 logger = Logger(to_file=True).get_logger()
 
+FETCH_STRATEGIES = ("auto", "window", "per_keyword")
+SHARD_SIZES = ("month", "week")
+SEARCH_URL = "https://api.sejm.gov.pl/eli/acts/search"
+
+class ResultCapExceeded(Exception):
+    """
+    Raised when a search query matches more acts than can be fetched reliably in one go.
+    """
+
 class LawScrapper():
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, fetch_strategy: str = "auto", window_max_days: int = 31, page_size: int = 500, http_client: HttpClient = None):
         """
         Initializes the LawScrapper class with the current date and year context.
-        Sets up a container to hold fetched acts.
+        Sets up a container to hold fetched acts and the HTTP client shared by all requests.
+
+        Parameters:
+            max_workers (int): Maximum number of concurrent requests when fetching several keywords.
+                Use 1 to fetch keywords one after another.
+            fetch_strategy (str): How to query several keywords:
+                "window" sends one unfiltered query for the date window and matches keywords locally,
+                "per_keyword" sends one query per keyword,
+                "auto" uses "window" for windows up to window_max_days and "per_keyword" otherwise.
+            window_max_days (int): Largest window (in days) for which "auto" picks the single window query.
+            page_size (int): Number of acts requested per page of search results.
+            http_client (HttpClient, optional): Rate-limited, retrying HTTP client, shared with the summarizer.
+                Defaults to a client of its own.
         """
+        if fetch_strategy not in FETCH_STRATEGIES:
+            raise ValueError(f"fetch_strategy must be one of {FETCH_STRATEGIES}")
+
         self.current_date = datetime.now()
         self.current_year = self.current_date.strftime("%Y")
         self.acts = []
+        self.max_workers = max(1, max_workers)
+        self.fetch_strategy = fetch_strategy
+        self.window_max_days = window_max_days
+        self.page_size = page_size
+
+        # One pooled, rate-limited client keeps TLS connections to api.sejm.gov.pl alive between requests
+        self.http = http_client or HttpClient(max_concurrency=self.max_workers)
 
     def get_acts_list(self, year: int = None, keywords: list = None, date_from: str = None, date_to: str = None) -> list:
         """
-        Fetches a list of legal acts from the Sejm API based on specified filters.
+        Fetches a list of legal acts from the Sejm API based on specified filters, following all result pages.
 
         Parameters:
             year (int, optional): Year of publication.
@@ -29,9 +63,63 @@ class LawScrapper():
         Returns:
             list: A list of legal acts matching the criteria.
         """
+        data = list(self._iter_search(year, keywords, date_from, date_to))
+        self.acts.extend(data)
+        return data
+
+    def _search_page(self, year: int = None, keywords: list = None, date_from: str = None, date_to: str = None, offset: int = 0) -> tuple:
+        """
+        Sends a single search request to the Sejm API without touching self.acts,
+        so it can be safely called from several threads at once.
+
+        Parameters:
+            year (int, optional): Year of publication.
+            keywords (list, optional): List of keywords to filter the acts.
+            date_from (str, optional): Starting date of effectiveness (YYYY-MM-DD).
+            date_to (str, optional): Ending date of effectiveness (YYYY-MM-DD).
+            offset (int): Index of the first result to return.
+
+        Returns:
+            tuple: A page of legal acts matching the criteria and the total number of matches reported by the API.
+
+        Raises:
+            requests.HTTPError: If the API does not answer with HTTP 200 after all retries.
+        """
+        params = self.search_params(year, keywords, date_from, date_to, offset)
+        url = SEARCH_URL
+
+        # Log the full URL with parameters for debugging purposes, but send the request with params on the pooled client
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        logger.info(f"Request URL: {full_url}")
+        response = self.http.get(url, params=params, headers={"Accept": "application/json"})
+
+        if response.status_code != 200:
+            # Failing loudly is better than a silently incomplete digest
+            logger.error(f"Error request: {response.status_code}")
+            raise requests.HTTPError(f"Search request failed with HTTP {response.status_code}", response=response)
+        payload = response.json()
+        data = payload.get("items", [])
+        total = payload.get("totalCount", offset + len(data))
+
+        if not data:
+            if not offset:
+                logger.warning("No acts matching the criteria were found.")
+            return [], total
+        else:
+            logger.info(f"Found {len(data)} acts (offset {offset}, total {total})")
+
+        return data, total
+
+    def search_params(self, year: int = None, keywords: list = None, date_from=None, date_to=None, offset: int = 0) -> dict:
+        """
+        Builds the query parameters of a search request, see _search_page.
+        """
         params = {
             "publisher": "DU",
+            "limit": self.page_size,
         }
+        if (offset):
+            params["offset"] = offset
         if (year):
             params["year"] = year
         if (keywords):
@@ -40,29 +128,279 @@ class LawScrapper():
             params["dateEffectFrom"] = date_from.strftime("%Y-%m-%d")
         if (date_to):
             params["dateEffectTo"] = date_to.strftime("%Y-%m-%d")
+        return params
 
-        url = "https://api.sejm.gov.pl/eli/acts/search"
+    def _iter_search(self, year: int = None, keywords: list = None, date_from: str = None, date_to: str = None, first_page: tuple = None, max_results: int = None):
+        """
+        Lazily pages through all results of a search query. The next page is only requested
+        once the previous one has been consumed.
 
-        # Log the full URL with parameters for debugging purposes, but use the original requests.get with params
-        full_url = requests.Request('GET', url, params=params).prepare().url
-        logger.info(f"Request URL: {full_url}")
-        response = requests.get(url, params=params, headers={"Accept": "application/json"})
+        Parameters:
+            year (int, optional): Year of publication.
+            keywords (list, optional): List of keywords to filter the acts.
+            date_from (str, optional): Starting date of effectiveness (YYYY-MM-DD).
+            date_to (str, optional): Ending date of effectiveness (YYYY-MM-DD).
+            first_page (tuple, optional): Already fetched (items, total) for offset 0.
+            max_results (int, optional): Raise instead of returning partial results when the query matches
+                more acts than this, or when the API stops returning pages before totalCount is reached.
 
-        if response.status_code == 200:
-            data = response.json().get("items", [])
-        else:
-            logger.error(f"Error request: {response.status_code}")
-            data = []
+        Yields:
+            dict: Raw act as returned by the API.
 
-        if not data:
-            logger.warning("No acts matching the criteria were found.")
-            return []
+        Raises:
+            ResultCapExceeded: If max_results is set and the query cannot be fetched completely.
+        """
+        data, total = first_page if first_page is not None else self._search_page(year, keywords, date_from, date_to)
+        if max_results is not None and total > max_results:
+            raise ResultCapExceeded(f"{total} acts match the query, cap is {max_results}")
+
+        offset = 0
+        while data:
+            yield from data
+            offset += len(data)
+            if offset >= total:
+                return
+            # The server may cap the page below self.page_size, so advance by what was actually returned
+            data, total = self._search_page(year, keywords, date_from, date_to, offset)
+
+        if offset < total:
+            if max_results is not None:
+                raise ResultCapExceeded(f"API stopped after {offset} of {total} acts")
+            logger.warning(f"API stopped after {offset} of {total} acts, results are incomplete")
+
+    def iter_acts(self, date_from=None, date_to=None, keywords: list = None, year: int = None):
+        """
+        Streams formatted acts matching any of the keywords, paging through the API lazily
+        and de-duplicating by ELI on the fly. Memory use does not grow with the number of pages,
+        which keeps year-long or multi-year backfills cheap.
+
+        Parameters:
+            date_from (datetime, optional): Starting date of effectiveness.
+            date_to (datetime, optional): Ending date of effectiveness.
+            keywords (list, optional): List of keywords to filter the acts.
+            year (int, optional): Year of publication.
+
+        Yields:
+            dict: Formatted act, see format_act.
+        """
+        for act in self._iter_raw_acts(date_from, date_to, keywords, year):
+            yield self.format_act(act)
+
+    def get_acts_for_keywords(self, year: int = None, keywords: list = None, date_from: str = None, date_to: str = None) -> list:
+        """
+        Fetches acts matching any of the keywords using the configured fetch strategy.
+
+        Parameters:
+            year (int, optional): Year of publication.
+            keywords (list, optional): List of keywords to filter the acts.
+            date_from (str, optional): Starting date of effectiveness (YYYY-MM-DD).
+            date_to (str, optional): Ending date of effectiveness (YYYY-MM-DD).
+
+        Returns:
+            list: Unique legal acts matching any of the keywords.
+        """
+        self.acts = list(self._iter_raw_acts(date_from, date_to, keywords, year))
+        return self.acts
+
+    def _iter_raw_acts(self, date_from=None, date_to=None, keywords: list = None, year: int = None, max_results: int = None):
+        """
+        Streams unique raw acts matching any of the keywords using the configured fetch strategy.
+
+        Parameters:
+            date_from (datetime, optional): Starting date of effectiveness.
+            date_to (datetime, optional): Ending date of effectiveness.
+            keywords (list, optional): List of keywords to filter the acts.
+            year (int, optional): Year of publication.
+            max_results (int, optional): Per-query cap, see _iter_search.
+
+        Yields:
+            dict: Raw act as returned by the API.
+        """
+        if not keywords or len(keywords) == 1:
+            acts = self._iter_search(year, keywords, date_from, date_to, max_results=max_results)
+        elif self._choose_strategy(date_from, date_to) == "window":
+            acts = self._iter_acts_by_window(year, keywords, date_from, date_to, max_results)
         else:
-            logger.info(f"Found {len(data)} acts")
+            acts = self._iter_acts_by_keyword(year, keywords, date_from, date_to, max_results)
+
+        seen_elis = set()  # Track unique ELI identifiers to avoid duplicates
+        for act in acts:
+            eli = act.get('ELI')
+            if eli and eli not in seen_elis:
+                seen_elis.add(eli)
+                yield act
+
+    def _choose_strategy(self, date_from, date_to) -> str:
+        """
+        Resolves the "auto" fetch strategy based on the size of the date window.
+
+        Parameters:
+            date_from (datetime, optional): Start of the window.
+            date_to (datetime, optional): End of the window.
+
+        Returns:
+            str: "window" or "per_keyword".
+        """
+        if self.fetch_strategy != "auto":
+            return self.fetch_strategy
+        if not date_from or not date_to:
+            return "per_keyword"
+        return "window" if (date_to - date_from).days <= self.window_max_days else "per_keyword"
+
+    def _iter_acts_by_window(self, year: int, keywords: list, date_from, date_to, max_results: int = None):
+        """
+        Pages through one unfiltered query for the date window and keeps the acts whose keywordsNames
+        contain any of the keywords. Acts are ordered as the per-keyword strategy would return them:
+        grouped by the first matching keyword, in the API order within each group. Only matching acts
+        are held until the window is exhausted.
+
+        Parameters:
+            year (int, optional): Year of publication.
+            keywords (list): List of keywords to match locally.
+            date_from (datetime, optional): Starting date of effectiveness.
+            date_to (datetime, optional): Ending date of effectiveness.
+            max_results (int, optional): Per-query cap, see _iter_search.
+
+        Yields:
+            dict: Raw act matching any of the keywords (may contain duplicates).
+        """
+        positions = {}
+        for position, keyword in enumerate(keywords):
+            positions.setdefault(keyword.casefold(), position)
+
+        groups = [[] for _ in keywords]
+        scanned = 0
+        for act in self._iter_search(year, None, date_from, date_to, max_results=max_results):
+            scanned += 1
+            matches = [positions[name.casefold()] for name in act.get("keywordsNames") or [] if name.casefold() in positions]
+            if matches:
+                groups[min(matches)].append(act)
+
+        logger.info(f"Matched {sum(len(group) for group in groups)} of {scanned} acts against {len(keywords)} keywords")
+        for group in groups:
+            yield from group
+
+    def _iter_acts_by_keyword(self, year: int, keywords: list, date_from, date_to, max_results: int = None):
+        """
+        Fetches acts for each keyword separately (the API cannot OR keywords) and streams them in keyword order.
+        The first page of every keyword is requested concurrently on the shared session; further pages
+        are requested lazily. Results are yielded in keyword order, so de-duplication by ELI is deterministic
+        regardless of which request finishes first.
+
+        Parameters:
+            year (int, optional): Year of publication.
+            keywords (list): List of keywords to query.
+            date_from (datetime, optional): Starting date of effectiveness.
+            date_to (datetime, optional): Ending date of effectiveness.
+            max_results (int, optional): Per-query cap, see _iter_search.
+
+        Yields:
+            dict: Raw act matching one of the keywords (may contain duplicates).
+        """
+        workers = min(self.max_workers, len(keywords))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # executor.map yields results in submission order, not completion order
+            first_pages = executor.map(lambda keyword: self._search_page(year, [keyword], date_from, date_to), keywords)
+            for keyword, first_page in zip(keywords, first_pages):
+                yield from self._iter_search(year, [keyword], date_from, date_to, first_page=first_page, max_results=max_results)
+
+    def iter_acts_sharded(self, date_from, date_to, keywords: list = None, shard: str = "month", max_shard_results: int = 2000):
+        """
+        Streams formatted acts for an arbitrary date range by splitting it into sub-windows (shards)
+        that are fetched concurrently. A shard whose query matches more than max_shard_results acts,
+        or which the API cannot page through completely, is split in half and fetched again, so large
+        backfills are never silently truncated. Shards are merged in chronological order into one
+        ELI-unique stream.
+
+        Parameters:
+            date_from (datetime): Starting date of effectiveness.
+            date_to (datetime): Ending date of effectiveness.
+            keywords (list, optional): List of keywords to filter the acts.
+            shard (str): Initial shard size, "month" or "week".
+            max_shard_results (int): Largest number of acts a single query in a shard may match.
+
+        Yields:
+            dict: Formatted act, see format_act.
+        """
+        if shard not in SHARD_SIZES:
+            raise ValueError(f"shard must be one of {SHARD_SIZES}")
+
+        shards = self._split_window(date_from, date_to, shard)
+        logger.info(f"Fetching {len(shards)} {shard} shards between {date_from:%Y-%m-%d} and {date_to:%Y-%m-%d}")
+
+        seen_elis = set()  # Track unique ELI identifiers across shards
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Keep a bounded number of shards in flight and consume them in submission order
+            pending = deque()
+            shards = iter(shards)
+            for shard_from, shard_to in shards:
+                pending.append(executor.submit(self._fetch_shard, shard_from, shard_to, keywords, max_shard_results))
+                if len(pending) >= self.max_workers:
+                    break
+
+            while pending:
+                acts = pending.popleft().result()
+                next_shard = next(shards, None)
+                if next_shard:
+                    pending.append(executor.submit(self._fetch_shard, *next_shard, keywords, max_shard_results))
+
+                for act in acts:
+                    eli = act.get('ELI')
+                    if eli and eli not in seen_elis:
+                        seen_elis.add(eli)
+                        yield self.format_act(act)
+
+    def _fetch_shard(self, date_from, date_to, keywords: list, max_results: int) -> list:
+        """
+        Fetches all acts of a single shard, splitting it in half while it exceeds the result cap.
+        A single-day shard cannot be split further and is fetched without the cap.
+
+        Parameters:
+            date_from (datetime): First day of the shard.
+            date_to (datetime): Last day of the shard.
+            keywords (list, optional): List of keywords to filter the acts.
+            max_results (int): Largest number of acts a single query may match.
+
+        Returns:
+            list: Raw acts of the shard in chronological sub-shard order (may contain duplicates).
+        """
+        days = (date_to - date_from).days
+        if days < 1:
+            return list(self._iter_raw_acts(date_from, date_to, keywords))
+
+        try:
+            return list(self._iter_raw_acts(date_from, date_to, keywords, max_results=max_results))
+        except ResultCapExceeded as e:
+            middle = date_from + relativedelta(days=days // 2)
+            logger.info(f"Re-sharding {date_from:%Y-%m-%d}..{date_to:%Y-%m-%d}: {e}")
+            return (self._fetch_shard(date_from, middle, keywords, max_results)
+                    + self._fetch_shard(middle + relativedelta(days=1), date_to, keywords, max_results))
+
+    def _split_window(self, date_from, date_to, shard: str) -> list:
+        """
+        Splits [date_from, date_to] into consecutive, non-overlapping sub-windows aligned to
+        calendar months or 7-day weeks. Both ends of every sub-window are inclusive.
+
+        Parameters:
+            date_from (datetime): Start of the range.
+            date_to (datetime): End of the range.
+            shard (str): "month" or "week".
+
+        Returns:
+            list: (date_from, date_to) tuples.
+        """
+        shards = []
+        start = date_from
+        while start <= date_to:
+            if shard == "month":
+                end = start.replace(day=1) + relativedelta(months=1, days=-1)
+            else:
+                end = start + relativedelta(days=6)
+            end = min(end, date_to)
+            shards.append((start, end))
+            start = end + relativedelta(days=1)
+        return shards
 
-        self.acts.extend(data)
-        return data
-    
     def get_acts_from_last_week(self, keywords: list = None):
         """
         Returns acts from the past 7 days, optionally filtered by keywords.
@@ -76,23 +414,7 @@ class LawScrapper():
         date_from = self.current_date - relativedelta(days=7)
         date_to = self.current_date
 
-        if len(keywords) == 1:
-            self.acts = []  # Clear previous results
-            return self.get_acts_list(self.current_year, keywords, date_from, date_to)
-        elif len(keywords) > 1:
-            all_acts = []
-            seen_elis = set()  # Track unique ELI identifiers to avoid duplicates
-            for keyword in keywords:
-                self.acts = []  # Clear previous results before each search
-                result = self.get_acts_list(self.current_year, [keyword], date_from, date_to)
-                # Add only unique acts based on ELI identifier
-                for act in result:
-                    eli = act.get('ELI')
-                    if eli and eli not in seen_elis:
-                        seen_elis.add(eli)
-                        all_acts.append(act)
-            self.acts = all_acts
-            return all_acts
+        return self.get_acts_for_keywords(self.current_year, keywords, date_from, date_to)
     
     def get_acts_from_current_month(self, keywords: list = None):
         """
@@ -108,23 +430,7 @@ class LawScrapper():
         date_from = self.current_date.replace(day=1)
         date_to = self.current_date
 
-        if len(keywords) == 1:
-            self.acts = []  # Clear previous results
-            return self.get_acts_list(self.current_year, keywords, date_from, date_to)
-        elif len(keywords) > 1:
-            all_acts = []
-            seen_elis = set()  # Track unique ELI identifiers to avoid duplicates
-            for keyword in keywords:
-                self.acts = []  # Clear previous results before each search
-                result = self.get_acts_list(self.current_year, [keyword], date_from, date_to)
-                # Add only unique acts based on ELI identifier
-                for act in result:
-                    eli = act.get('ELI')
-                    if eli and eli not in seen_elis:
-                        seen_elis.add(eli)
-                        all_acts.append(act)
-            self.acts = all_acts
-            return all_acts
+        return self.get_acts_for_keywords(self.current_year, keywords, date_from, date_to)
 
     def get_acts_from_last_month(self, keywords: list = None):
         """
@@ -139,23 +445,7 @@ class LawScrapper():
         date_from = self.current_date - relativedelta(months=1)
         date_to = self.current_date
 
-        if len(keywords) == 1:
-            self.acts = []  # Clear previous results
-            return self.get_acts_list(self.current_year, keywords, date_from, date_to)
-        elif len(keywords) > 1:
-            all_acts = []
-            seen_elis = set()  # Track unique ELI identifiers to avoid duplicates
-            for keyword in keywords:
-                self.acts = []  # Clear previous results before each search
-                result = self.get_acts_list(self.current_year, [keyword], date_from, date_to)
-                # Add only unique acts based on ELI identifier
-                for act in result:
-                    eli = act.get('ELI')
-                    if eli and eli not in seen_elis:
-                        seen_elis.add(eli)
-                        all_acts.append(act)
-            self.acts = all_acts
-            return all_acts
+        return self.get_acts_for_keywords(self.current_year, keywords, date_from, date_to)
         
     def get_acts_from_last_year(self, keywords: list = None):
         """
@@ -170,23 +460,7 @@ class LawScrapper():
         date_from = self.current_date - relativedelta(days=365)
         date_to = self.current_date
 
-        if len(keywords) == 1:
-            self.acts = []  # Clear previous results
-            return self.get_acts_list(None, keywords, date_from, date_to)
-        elif len(keywords) > 1:
-            all_acts = []
-            seen_elis = set()  # Track unique ELI identifiers to avoid duplicates
-            for keyword in keywords:
-                self.acts = []  # Clear previous results before each search
-                result = self.get_acts_list(None, [keyword], date_from, date_to)
-                # Add only unique acts based on ELI identifier
-                for act in result:
-                    eli = act.get('ELI')
-                    if eli and eli not in seen_elis:
-                        seen_elis.add(eli)
-                        all_acts.append(act)
-            self.acts = all_acts
-            return all_acts
+        return self.get_acts_for_keywords(None, keywords, date_from, date_to)
     
     def get_formatted_list(self, to_json=False)-> list:
         """
@@ -198,27 +472,37 @@ class LawScrapper():
         Returns:
             list or str: Formatted list of acts, or JSON string if to_json=True.
         """
-        formatted_list = []
-        for act in self.acts:
-            table = {
-                "title": self.get_formated_value(act, "title"),
-                "summary": None,
-                "inForce": True if act.get("inForce") == "IN_FORCE" else False,
-                "entryIntoForce": self.get_formated_value(act, "entryIntoForce"),
-                "validFrom": self.get_formated_value(act, "validFrom"),
-                "announcementDate": self.get_formated_value(act, "announcementDate"),
-                "promulgation": self.get_formated_value(act, "promulgation"),
-                "keywords": self.get_formated_value(act, "keywordsNames"),
-                "pdf": f"https://api.sejm.gov.pl/eli/acts/{act.get('ELI')}/text.pdf" if act.get("textPDF") else None,
-                "html": f"https://api.sejm.gov.pl/eli/acts/{act.get('ELI')}/text.html" if act.get("textHTML") else None,
-            }
-            formatted_list.append(table)
-        
+        formatted_list = [self.format_act(act) for act in self.acts]
+
         if to_json:
             formatted_list = json.dumps(formatted_list, ensure_ascii=False, indent=2)
 
         return formatted_list
     
+    def format_act(self, act: dict) -> dict:
+        """
+        Returns a cleaned and formatted version of a single raw act.
+
+        Parameters:
+            act (dict): Dictionary representing a single legal act.
+
+        Returns:
+            dict: Formatted act.
+        """
+        return {
+            "eli": act.get("ELI"),
+            "title": self.get_formated_value(act, "title"),
+            "summary": None,
+            "inForce": True if act.get("inForce") == "IN_FORCE" else False,
+            "entryIntoForce": self.get_formated_value(act, "entryIntoForce"),
+            "validFrom": self.get_formated_value(act, "validFrom"),
+            "announcementDate": self.get_formated_value(act, "announcementDate"),
+            "promulgation": self.get_formated_value(act, "promulgation"),
+            "keywords": self.get_formated_value(act, "keywordsNames"),
+            "pdf": f"https://api.sejm.gov.pl/eli/acts/{act.get('ELI')}/text.pdf" if act.get("textPDF") else None,
+            "html": f"https://api.sejm.gov.pl/eli/acts/{act.get('ELI')}/text.html" if act.get("textHTML") else None,
+        }
+
     def get_formated_value(self, act: dict, value: str) -> str:
         """
         Safely extracts and formats a value from a dictionary.
@@ -241,16 +525,17 @@ class LawScrapper():
 
         Returns:
             list: List of keywords.
+
+        Raises:
+            requests.HTTPError: If the API does not answer with HTTP 200 after all retries.
         """
         url = "https://api.sejm.gov.pl/eli/keywords"
-        response = requests.get(url)
+        response = self.http.get(url, headers={"Accept": "application/json"})
 
-        if response.status_code == 200:
-            data = response.json()
-        else:
+        if response.status_code != 200:
             logger.error(f"Error request: {response.status_code}")
-
-        return data
+            raise requests.HTTPError(f"Keywords request failed with HTTP {response.status_code}", response=response)
+        return response.json()
 
 if __name__ == "__main__":
     scrapper = LawScrapper()
@@ -1,40 +1,48 @@
 import os
 from dotenv import load_dotenv
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.mime.application import MIMEApplication
+from mailer import Mailer, parse_recipients
 from logger import Logger
 
 logger = Logger(to_file=True).get_logger()
 
 load_dotenv()
 
-def send_notification(subject: str, title: str, body: str, table: str = None):
+def send_notification(subject: str, title: str, body: str, table: str = None, attachments: list = None, recipients: list = None, mailer: Mailer = None) -> bool:
     """
     Sends a styled HTML email notification via SMTP using environmental credentials.
+    A message that cannot be sent is queued in the mailer's outbox instead of raising.
 
     Parameters:
         subject (str): The subject of the email.
         title (str): The main title to display in the email body.
         body (str): The plain-text body content of the message.
         table (str, optional): Optional HTML table or block to embed in the email body.
+        attachments (list, optional): Files to attach as (filename, content bytes, MIME type) tuples.
+        recipients (list, optional): Recipient addresses, SMTP_TO by default.
+        mailer (Mailer, optional): Mailer whose connection is reused; a one-off mailer is used if omitted.
 
     Environment Variables Required:
         SMTP_FROM: Sender email address.
-        SMTP_TO: Recipient email address.
+        SMTP_TO: Recipient email addresses, comma-separated.
         SMTP_SERVER: SMTP server address.
         SMTP_PORT: SMTP server port (default is 465).
         SMTP_USER: SMTP username.
         SMTP_PASSWORD: SMTP password.
+        SMTP_SECURITY: ssl, starttls or none (default is ssl).
+
+    Returns:
+        bool: True if the email was sent, False if it was queued in the outbox.
 
     Raises:
         ValueError: If SMTP_PORT is not a valid integer.
-        smtplib.SMTPException: If there is an issue sending the email.
     """
-    msg = MIMEMultipart("alternative")
+    msg = MIMEMultipart("mixed") if attachments else MIMEMultipart("alternative")
     msg['Subject'] = subject
     msg['From'] = os.getenv('SMTP_FROM')
-    msg['To'] = os.getenv('SMTP_TO')
+    msg['To'] = ", ".join(parse_recipients(recipients or os.getenv('SMTP_TO')))
 
     style = r"""<style type="text/css">
       body,table,td{font-family:Helvetica,Arial,sans-serif !important}.ExternalClass{width:100%}.ExternalClass,.ExternalClass p,.ExternalClass span,.ExternalClass font,.ExternalClass td,.ExternalClass div{line-height:150%}a{text-decoration:none}*{color:inherit}a[x-apple-data-detectors],u+#body a,#MessageViewBody a{color:inherit;text-decoration:none;font-size:inherit;font-family:inherit;font-weight:inherit;line-height:inherit}img{-ms-interpolation-mode:bicubic}table:not([class^=s-]){font-family:Helvetica,Arial,sans-serif;mso-table-lspace:0pt;mso-table-rspace:0pt;border-spacing:0px;border-collapse:collapse}table:not([class^=s-]) td{border-spacing:0px;border-collapse:collapse}@media screen and (max-width: 600px){.w-full,.w-full>tbody>tr>td{width:100% !important}*[class*=s-lg-]>tbody>tr>td{font-size:0 !important;line-height:0 !important;height:0 !important}.s-2>tbody>tr>td{font-size:8px !important;line-height:8px !important;height:8px !important}.s-5>tbody>tr>td{font-size:20px !important;line-height:20px !important;height:20px !important}.s-10>tbody>tr>td{font-size:40px !important;line-height:40px !important;height:40px !important}}
@@ -206,21 +214,23 @@ def send_notification(subject: str, title: str, body: str, table: str = None):
 
     html_part = MIMEText(html, "html", "utf-8")
     text_part = MIMEText(f"{title}\n\n{body}", "plain")
-    msg.attach(text_part)
-    msg.attach(html_part)
-
-    smtp_port = os.getenv("SMTP_PORT", 465)  # Default to 465 if SMTP_PORT is not set
-
-    try:
-        smtp_port = int(smtp_port)
-    except ValueError:
-        raise ValueError("SMTP_PORT must be a valid integer.")
-
-    with smtplib.SMTP_SSL(os.getenv("SMTP_SERVER"), int(smtp_port)) as server:
-        server.login(os.getenv("SMTP_USER"), os.getenv("SMTP_PASSWORD"))
-        server.send_message(msg)
+    if attachments:
+        alternative = MIMEMultipart("alternative")
+        alternative.attach(text_part)
+        alternative.attach(html_part)
+        msg.attach(alternative)
+        for filename, content, mimetype in attachments:
+            part = MIMEApplication(content, _subtype=mimetype.split("/", 1)[-1])
+            part.add_header("Content-Disposition", "attachment", filename=filename)
+            msg.attach(part)
+    else:
+        msg.attach(text_part)
+        msg.attach(html_part)
 
-    logger.info(f"Email sent to {msg['To']} with subject: {subject}")
+    if mailer is not None:
+        return mailer.send(msg)
+    with Mailer() as mailer:
+        return mailer.send(msg)
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
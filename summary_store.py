@@ -0,0 +1,135 @@
+import hashlib
+import threading
+from datetime import datetime
+from sqlalchemy import String, Float, Text, DateTime, select, delete, or_
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from database import Base, get_engine
+from logger import Logger
+
+logger = Logger(to_file=True).get_logger()
+
+class SummaryRecord(Base):
+    """
+    A summary produced by the LLM for a given act text, model configuration and prompt.
+    """
+    __tablename__ = "summaries"
+
+    eli: Mapped[str] = mapped_column(String, primary_key=True)
+    text_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String, primary_key=True)
+    temperature: Mapped[float] = mapped_column(Float, primary_key=True)
+    prompt_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    summary: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+def content_hash(text: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a text, used as part of the summary cache key.
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+class SummaryStore():
+    def __init__(self, url: str = "sqlite:///cache/lawscrapper.db"):
+        """
+        Initializes a durable store of LLM summaries keyed by
+        (ELI, extracted-text hash, model id, temperature, prompt hash).
+
+        Parameters:
+            url (str): SQLAlchemy database URL.
+        """
+        self.engine = get_engine(url)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, eli: str, text_hash: str, model: str, temperature: float, prompt_hash: str) -> str:
+        """
+        Looks up a stored summary and updates the hit/miss counters.
+
+        Returns:
+            str: Stored summary, or None on a miss.
+        """
+        with Session(self.engine) as session:
+            record = session.get(SummaryRecord, (eli, text_hash, model, temperature, prompt_hash))
+            summary = record.summary if record else None
+
+        with self._lock:
+            if summary is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return summary
+
+    def put(self, eli: str, text_hash: str, model: str, temperature: float, prompt_hash: str, summary: str):
+        """
+        Stores (or replaces) a summary.
+        """
+        with Session(self.engine) as session:
+            session.merge(SummaryRecord(
+                eli=eli,
+                text_hash=text_hash,
+                model=model,
+                temperature=temperature,
+                prompt_hash=prompt_hash,
+                summary=summary,
+                created_at=datetime.now(),
+            ))
+            session.commit()
+
+    def get_latest(self, eli: str, model: str, temperature: float, prompt_hash: str) -> str:
+        """
+        Returns the most recent summary of an act made with the given model, temperature and prompt,
+        whatever text it was made from. Used to reuse summaries of near-duplicate acts.
+
+        Returns:
+            str: Stored summary, or None if there is none.
+        """
+        with Session(self.engine) as session:
+            return session.scalars(
+                select(SummaryRecord.summary)
+                .where(
+                    SummaryRecord.eli == eli,
+                    SummaryRecord.model == model,
+                    SummaryRecord.temperature == temperature,
+                    SummaryRecord.prompt_hash == prompt_hash,
+                )
+                .order_by(SummaryRecord.created_at.desc())
+                .limit(1)
+            ).first()
+
+    def invalidate_stale(self, model: str, temperature: float, prompt_hash: str) -> int:
+        """
+        Deletes summaries produced with a different model, temperature or prompt than the current ones.
+
+        Returns:
+            int: Number of deleted summaries.
+        """
+        with Session(self.engine) as session:
+            result = session.execute(delete(SummaryRecord).where(or_(
+                SummaryRecord.model != model,
+                SummaryRecord.temperature != temperature,
+                SummaryRecord.prompt_hash != prompt_hash,
+            )))
+            session.commit()
+
+        if result.rowcount:
+            logger.info(f"Invalidated {result.rowcount} summaries produced with another model or prompt")
+        return result.rowcount
+
+    def count(self) -> int:
+        """
+        Returns the number of stored summaries.
+        """
+        with Session(self.engine) as session:
+            return len(session.scalars(select(SummaryRecord.eli)).all())
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss statistics collected since the store was created.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }